@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import numpy as np
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def brute_force_search(vectors, query, k=10, exclude=None):
+    """Exact cosine top-k over L2-normalised vectors, used as the recall baseline"""
+    scores = vectors @ query
+    if exclude is not None:
+        scores[exclude] = -np.inf
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    order = np.argsort(-scores[top], kind='stable')
+    return top[order], scores[top[order]]
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest neighbour index for cosine similarity.
+
+    A spherical k-means coarse quantizer splits the vectors into `n_lists`
+    cells.  A query scores the centroids, visits the `n_probe` best cells and
+    ranks only the vectors stored there.  Raising `n_probe` trades queries per
+    second for recall; `n_probe == n_lists` is an exact search.
+
+    Vectors are stored grouped by cell, so every probed cell is one contiguous
+    slice and the whole index can be memory-mapped from disk.
+    """
+
+    def __init__(self, n_lists=256, n_probe=8, n_iter=20, train_size=100000, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.train_size = train_size
+        self.seed = seed
+        self.centroids = None
+        self.list_ptr = None
+        self.list_ids = None
+        self.vectors = None
+        self.positions = None
+
+    def fit(self, vectors, chunk_size=65536):
+        start_time = time.time()
+        vectors = normalize_rows(vectors)
+        n = len(vectors)
+        rng = np.random.default_rng(self.seed)
+        self.n_lists = max(1, min(self.n_lists, n))
+
+        sample = vectors[rng.choice(n, size=min(n, self.train_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=self.n_lists, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assignment = self._assign(sample, centroids, chunk_size)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=self.n_lists)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = normalize_rows(sums)
+        self.centroids = centroids
+
+        assignment = self._assign(vectors, centroids, chunk_size)
+        order = np.argsort(assignment, kind='stable')
+        self.list_ids = order.astype(np.int32)
+        self.vectors = vectors[order]
+        self.list_ptr = np.zeros(self.n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=self.n_lists), out=self.list_ptr[1:])
+        self.positions = np.empty(n, dtype=np.int32)
+        self.positions[self.list_ids] = np.arange(n, dtype=np.int32)
+
+        print(f"IVF index built: {n} vectors, {self.n_lists} lists in {time.time() - start_time:.1f}s")
+        return self
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk_size):
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            block = vectors[start:start + chunk_size]
+            assignment[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+    def vector(self, i):
+        """The stored (normalised) vector of item `i`"""
+        return np.asarray(self.vectors[self.positions[i]])
+
+    def search(self, query, k=10, n_probe=None, exclude=None):
+        """Approximate top-k as (item ids, cosine scores), best first"""
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        query = np.asarray(query, dtype=np.float32)
+
+        centroid_scores = self.centroids @ query
+        if n_probe < self.n_lists:
+            probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            probes = np.arange(self.n_lists)
+
+        candidate_ids, candidate_scores = [], []
+        for cell in probes:
+            start, end = self.list_ptr[cell], self.list_ptr[cell + 1]
+            if start == end:
+                continue
+            candidate_ids.append(self.list_ids[start:end])
+            candidate_scores.append(self.vectors[start:end] @ query)
+        if not candidate_ids:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        ids = np.concatenate(candidate_ids)
+        scores = np.concatenate(candidate_scores)
+        if exclude is not None:
+            keep = ids != exclude
+            ids, scores = ids[keep], scores[keep]
+
+        k = min(k, len(ids))
+        if k <= 0:
+            return ids[:0], scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k]
+        order = np.argsort(-scores[top], kind='stable')
+        return ids[top[order]], scores[top[order]]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ('centroids', 'list_ptr', 'list_ids', 'vectors', 'positions'):
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'n_lists': self.n_lists,
+                'n_probe': self.n_probe,
+                'vectors': int(len(self.list_ids)),
+                'dim': int(self.vectors.shape[1])
+            }, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        index = cls(n_lists=meta['n_lists'], n_probe=meta['n_probe'])
+        mmap_mode = 'r' if mmap else None
+        for name in ('centroids', 'list_ptr', 'list_ids', 'vectors', 'positions'):
+            setattr(index, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode))
+        # Centroids are scored on every query, keep them in RAM
+        index.centroids = np.ascontiguousarray(index.centroids)
+        index.list_ptr = np.asarray(index.list_ptr)
+        return index
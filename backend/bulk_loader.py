@@ -0,0 +1,267 @@
+import os
+import time
+import tempfile
+import numpy as np
+from sqlalchemy import create_engine, inspect, text
+
+RATINGS_TABLE = 'amazon_beauty'
+RATINGS_COLUMNS = ['ProductId', 'ProductType', 'Rating', 'URL', 'Timestamp', 'UserId']
+
+# Secondary indexes of amazon_beauty, built once the rows are in rather than maintained row by row
+RATINGS_INDEXES = {
+    'idx_product_id': 'ProductId',
+    'idx_user_id': 'UserId',
+    'idx_rating': 'Rating',
+    'idx_product_user': 'ProductId, UserId'
+}
+
+# Hash of the source CSV row (see scripts/preprocess_and_load.row_hashes): the key incremental loads upsert on.
+# Rows inserted by the API have none, and NULLs never collide.
+RATINGS_UNIQUE_INDEXES = {
+    'uq_row_hash': 'row_hash'
+}
+
+# High-water marks of scripts/preprocess_and_load.ingest_incremental, one row per source file
+INGEST_STATE_TABLE = 'ingest_state'
+
+INGEST_STATE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {INGEST_STATE_TABLE} (
+        source VARCHAR(255) NOT NULL PRIMARY KEY,
+        file_offset BIGINT NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        max_timestamp BIGINT,
+        rows_loaded BIGINT NOT NULL DEFAULT 0,
+        updated_at BIGINT NOT NULL
+    )
+"""
+
+# LOAD DATA LOCAL INFILE only reads files from here (mysql-connector allow_local_infile_in_path)
+BULK_LOAD_DIR = os.environ.get('BULK_LOAD_DIR', os.path.join(tempfile.gettempdir(), 'dropshipping-bulk-load'))
+
+def ratings_table_ddl(dialect_name, table=RATINGS_TABLE):
+    id_column = (
+        "id INTEGER PRIMARY KEY AUTOINCREMENT" if dialect_name == 'sqlite'
+        else "id INT AUTO_INCREMENT PRIMARY KEY"
+    )
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            {id_column},
+            ProductId VARCHAR(255),
+            ProductType VARCHAR(255),
+            Rating FLOAT,
+            URL TEXT,
+            Timestamp BIGINT,
+            UserId VARCHAR(255),
+            row_hash BIGINT
+        )
+    """
+
+def create_ratings_table(conn, replace=False, table=RATINGS_TABLE):
+    """amazon_beauty without its secondary indexes; see create_ratings_indexes"""
+    if replace:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    conn.execute(text(ratings_table_ddl(conn.dialect.name, table)))
+    # Tables from before row_hash get the column, NULL for their rows until a full ingest
+    if 'row_hash' not in {column['name'] for column in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN row_hash BIGINT"))
+
+def create_ingest_state_table(conn):
+    conn.execute(text(INGEST_STATE_DDL))
+
+def create_ratings_indexes(engine, table=RATINGS_TABLE):
+    """Creates whichever of RATINGS_INDEXES and RATINGS_UNIQUE_INDEXES the table is missing; returns their names"""
+    # Matched on columns, since a table swapped in under this name keeps its own index names
+    existing = {tuple(index['column_names']) for index in inspect(engine).get_indexes(table)}
+    indexes = [(name, columns, '') for name, columns in RATINGS_INDEXES.items()]
+    indexes += [(name, columns, 'UNIQUE ') for name, columns in RATINGS_UNIQUE_INDEXES.items()]
+    taken = set()
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as conn:
+            taken = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    missing = []
+    for name, columns, unique in indexes:
+        if tuple(column.strip() for column in columns.split(',')) in existing:
+            continue
+        # Index names are per database on SQLite, so copies of the table get suffixed ones.  A table
+        # swapped in by an earlier run keeps its suffixed names, so the suffix skips any still in use.
+        if table != RATINGS_TABLE and engine.dialect.name == 'sqlite':
+            base, run = f"{name}_{table}", 1
+            name = base
+            while name in taken:
+                run += 1
+                name = f"{base}_{run}"
+        missing.append((name, columns, unique))
+
+    with engine.connect() as conn:
+        if engine.dialect.name == 'mysql' and missing:
+            # One ALTER builds every index in a single pass over the table
+            conn.execute(text(f"ALTER TABLE {table} " + ", ".join(
+                f"ADD {unique}INDEX {name} ({columns})" for name, columns, unique in missing
+            )))
+        else:
+            for name, columns, unique in missing:
+                conn.execute(text(f"CREATE {unique}INDEX {name} ON {table} ({columns})"))
+    return [name for name, _, _ in missing]
+
+def _tsv_column(series):
+    """One column in LOAD DATA's default format: tab separated, backslash escaped, NULL as \\N"""
+    if series.dtype.kind == 'f':
+        values = series.dropna()
+        if len(values) and (values % 1 == 0).all():
+            # Whole-number floats (a Timestamp column after to_numeric) load into BIGINT as integers
+            series = series.astype('Int64')
+        return series.astype(str).where(series.notna(), '\\N')
+    if series.dtype.kind in 'iub':
+        return series.astype(np.int64).astype(str)
+    text_values = (
+        series.astype(str)
+        .str.replace('\\', '\\\\', regex=False)
+        .str.replace('\t', '\\t', regex=False)
+        .str.replace('\n', '\\n', regex=False)
+        .str.replace('\r', '\\r', regex=False)
+    )
+    return text_values.where(series.notna(), '\\N')
+
+class BulkLoader:
+    """
+    Appends DataFrame chunks to a table much faster than DataFrame.to_sql.
+
+    On MySQL each chunk is written to a temporary TSV under BULK_LOAD_DIR
+    and sent with `LOAD DATA LOCAL INFILE`, over a dedicated connection that
+    is only allowed to read that directory.  If the server refuses local
+    infiles (or on any other database) the loader switches to `executemany`
+    of `batch_size` rows at a time on the raw DB-API cursor, which
+    mysql-connector turns into multi-row INSERTs.
+    """
+
+    def __init__(self, engine, table=RATINGS_TABLE, columns=RATINGS_COLUMNS, batch_size=5000, method=None):
+        self.engine = engine
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        self.method = method or ('load_data' if engine.dialect.name == 'mysql' else 'executemany')
+        self._infile_engine = None
+        self.rows = 0
+        self.load_time = 0.0
+
+    def create_table(self, replace=False):
+        with self.engine.connect() as conn:
+            with conn.begin():
+                create_ratings_table(conn, replace=replace, table=self.table)
+
+    def create_indexes(self):
+        return create_ratings_indexes(self.engine, self.table)
+
+    def load(self, frame):
+        """Appends the table's columns of `frame`; returns the number of rows loaded"""
+        columns = [column for column in self.columns if column in frame.columns]
+        frame = frame[columns]
+        if frame.empty:
+            return 0
+
+        start_time = time.time()
+        if self.method == 'load_data':
+            try:
+                self._load_data(frame, columns)
+            except Exception as e:
+                print(f"LOAD DATA LOCAL INFILE unavailable, falling back to executemany: {str(e)}")
+                self.method = 'executemany'
+                self._executemany(frame, columns)
+        else:
+            self._executemany(frame, columns)
+        self.load_time += time.time() - start_time
+        self.rows += len(frame)
+        return len(frame)
+
+    def _load_data(self, frame, columns):
+        if self._infile_engine is None:
+            os.makedirs(BULK_LOAD_DIR, exist_ok=True)
+            self._infile_engine = create_engine(
+                self.engine.url,
+                connect_args={
+                    'connect_timeout': 10,
+                    'use_pure': True,
+                    'allow_local_infile_in_path': BULK_LOAD_DIR
+                }
+            )
+
+        lines = _tsv_column(frame[columns[0]]).str.cat(
+            [_tsv_column(frame[column]) for column in columns[1:]], sep='\t'
+        ) if len(columns) > 1 else _tsv_column(frame[columns[0]])
+
+        handle, path = tempfile.mkstemp(suffix='.tsv', dir=BULK_LOAD_DIR)
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8', newline='') as f:
+                f.write('\n'.join(lines))
+                f.write('\n')
+
+            statement = (
+                f"LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' INTO TABLE {self.table} "
+                r"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\t' ESCAPED BY '\\' LINES TERMINATED BY '\n' "
+                f"({', '.join(columns)})"
+            )
+            connection = self._infile_engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(statement)
+                connection.commit()
+                cursor.close()
+            finally:
+                connection.close()
+        finally:
+            os.remove(path)
+
+    def _executemany(self, frame, columns):
+        placeholder = '?' if self.engine.dialect.paramstyle == 'qmark' else '%s'
+        statement = (
+            f"INSERT INTO {self.table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join([placeholder] * len(columns))})"
+        )
+        # Plain Python values with None for missing ones; DB-API drivers do not take NumPy scalars
+        rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    cursor.executemany(statement, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(statement, batch)
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+
+    def close(self):
+        if self._infile_engine is not None:
+            self._infile_engine.dispose()
+            self._infile_engine = None
+
+    def stats(self):
+        return {
+            "method": self.method,
+            "rows": self.rows,
+            "load_time": self.load_time,
+            "rows_per_second": self.rows / self.load_time if self.load_time else 0.0
+        }
+
+def swap_in_table(engine, staged, table=RATINGS_TABLE):
+    """Atomically replaces `table` with the fully loaded and indexed `staged` table"""
+    old = f"{table}_old"
+    existing = set(inspect(engine).get_table_names())
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {old}"))
+        if engine.dialect.name == 'mysql':
+            renames = f"{table} TO {old}, {staged} TO {table}" if table in existing else f"{staged} TO {table}"
+            conn.execute(text(f"RENAME TABLE {renames}"))
+        else:
+            # SQLite DDL is transactional: readers see either the old table or the new one
+            with conn.begin():
+                if table in existing:
+                    conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+                conn.execute(text(f"ALTER TABLE {staged} RENAME TO {table}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {old}"))
@@ -0,0 +1,748 @@
+import json
+import os
+import random
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from urllib.parse import urlparse
+
+# e.g. redis://localhost:6379/0 or sqlite:///var/cache/dropshipping.db; empty keeps caches per process
+CACHE_BACKEND_URL = os.environ.get('CACHE_BACKEND', '')
+CACHE_REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', 4))
+
+# Shared caches whose entries are tagged with the ProductIds they were built from
+PRODUCT_CACHES = ('product_details', 'hybrid_recommendations', 'trends')
+
+_caches = weakref.WeakSet()
+_caches_lock = threading.Lock()
+_shared_backend = None
+_shared_backend_lock = threading.Lock()
+_refresh_executor = None
+_refresh_executor_pid = None
+
+def estimate_size(value, _depth=0):
+    """Approximate deep size in bytes of the plain data we cache (dicts, lists, strings, numbers)"""
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+class RedisBackend:
+    """
+    Minimal Redis client speaking RESP over a plain socket, enough for the
+    cache (GET, SET PX, DEL, SADD, SMEMBERS, PEXPIRE).  One connection per
+    thread and process.  Any connection error or error reply is reported and
+    treated as a miss, so a Redis outage only makes the cache colder.
+    """
+
+    def __init__(self, host='localhost', port=6379, db=0, timeout=1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @classmethod
+    def from_url(cls, url):
+        parsed = urlparse(url)
+        db = int(parsed.path.strip('/') or 0)
+        return cls(parsed.hostname or 'localhost', parsed.port or 6379, db)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            if self.db:
+                self._execute(conn, 'SELECT', self.db)
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn[0].close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _encode(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload
+        if prefix == b'-':
+            raise RuntimeError(payload.decode('utf-8', 'replace'))
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply(reader) for _ in range(length)]
+        # The stream is out of step; treated as a broken connection so it is reopened
+        raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+    def _execute(self, conn, *args):
+        sock, reader = conn
+        sock.sendall(self._encode(args))
+        return self._read_reply(reader)
+
+    def command(self, *args):
+        try:
+            return self._execute(self._connection(), *args)
+        except (OSError, ConnectionError) as e:
+            self._reset()
+            print(f"Redis cache unavailable: {str(e)}")
+            return None
+        except RuntimeError as e:
+            # An error reply (OOM, READONLY, WRONGTYPE) leaves the connection in step, so it is kept
+            print(f"Redis cache error: {str(e)}")
+            return None
+
+    def get(self, key):
+        return self.command('GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            self.command('SET', key, value)
+        else:
+            self.command('SET', key, value, 'PX', max(int(ttl * 1000), 1))
+
+    def delete(self, key):
+        self.command('DEL', key)
+
+    def tag(self, key, tags, ttl=None):
+        for tag in tags:
+            self.command('SADD', tag, key)
+            if ttl is not None:
+                self.command('PEXPIRE', tag, max(int(ttl * 1000), 1))
+
+    def invalidate_tag(self, tag):
+        keys = self.command('SMEMBERS', tag) or []
+        if keys:
+            self.command('DEL', *keys)
+        self.command('DEL', tag)
+        return len(keys)
+
+class SQLiteBackend:
+    """
+    Cache store in a local SQLite file, shared by every worker process on the
+    host and kept across restarts.  Connections are per thread and process;
+    WAL mode lets readers run while one worker writes.
+    """
+
+    def __init__(self, path, timeout=1.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_tags (
+                tag TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (tag, key)
+            )
+        """)
+
+    @classmethod
+    def from_url(cls, url):
+        return cls(url[len('sqlite:///'):] if url.startswith('sqlite:///') else urlparse(url).path)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _run(self, statement, params=()):
+        try:
+            return self._connection().execute(statement, params)
+        except sqlite3.Error as e:
+            print(f"SQLite cache unavailable: {str(e)}")
+            return None
+
+    def get(self, key):
+        cursor = self._run("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,))
+        row = cursor.fetchone() if cursor is not None else None
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            self.delete(key)
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._run(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            self._run("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            self._run("DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)")
+
+    def delete(self, key):
+        self._run("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def tag(self, key, tags, ttl=None):
+        for tag in tags:
+            self._run("INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", (str(tag), key))
+
+    def invalidate_tag(self, tag):
+        cursor = self._run("SELECT key FROM cache_tags WHERE tag = ?", (str(tag),))
+        keys = [row[0] for row in cursor.fetchall()] if cursor is not None else []
+        for key in keys:
+            self.delete(key)
+        self._run("DELETE FROM cache_tags WHERE tag = ?", (str(tag),))
+        return len(keys)
+
+def create_backend(url):
+    if url.startswith('redis://'):
+        return RedisBackend.from_url(url)
+    if url.startswith('sqlite:'):
+        return SQLiteBackend.from_url(url)
+    raise ValueError(f"Unknown cache backend: {url}")
+
+def get_shared_backend():
+    """The process-wide shared cache backend configured by CACHE_BACKEND, or None"""
+    global _shared_backend
+    if _shared_backend is not None:
+        # Also one installed with set_shared_backend when CACHE_BACKEND is unset
+        return _shared_backend
+    if not CACHE_BACKEND_URL:
+        return None
+    with _shared_backend_lock:
+        if _shared_backend is None:
+            try:
+                _shared_backend = create_backend(CACHE_BACKEND_URL)
+            except Exception as e:
+                print(f"Shared cache backend unavailable: {str(e)}")
+                return None
+        return _shared_backend
+
+def set_shared_backend(backend):
+    global _shared_backend
+    with _shared_backend_lock:
+        _shared_backend = backend
+
+def get_refresh_executor():
+    """Pool running stale-while-revalidate refreshes; recreated in forked children"""
+    global _refresh_executor, _refresh_executor_pid
+    with _shared_backend_lock:
+        if _refresh_executor is None or _refresh_executor_pid != os.getpid():
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+            )
+            _refresh_executor_pid = os.getpid()
+        return _refresh_executor
+
+class BoundedCache:
+    """
+    Thread-safe LRU cache bounded by approximate memory and entry count, with
+    a TTL per entry.
+
+    `jitter` spreads expiry times by up to that fraction of the TTL so entries
+    written together do not all expire (and get recomputed) together.  Entries
+    can carry tags, typically ProductIds, and `invalidate_tag` drops every
+    entry with a given tag.  Hit, miss, expiry and eviction counts are kept
+    for `stats()`.
+
+    With `shared=True` the in-process entries become an L1 in front of the
+    shared backend (Redis or SQLite, see CACHE_BACKEND): misses fall through
+    to it and writes and invalidations go to both, so other workers and
+    restarted processes start warm.  Values crossing the backend are JSON,
+    and `l1_ttl` caps how long a worker may hold an entry that another
+    worker has since invalidated.
+
+    With a `grace` period, expired entries are kept that much longer for
+    stale-while-revalidate reads: `lookup` and `get_or_refresh` still return
+    them, flagged stale, while `refresh` recomputes them in the background.
+    Past the grace period they are gone, so `ttl + grace` bounds how stale a
+    served value can be.  Invalidated entries are never served stale.
+    """
+
+    def __init__(self, name, max_bytes=64 * 1024 * 1024, max_entries=None, ttl=300, jitter=0.0,
+                 shared=False, l1_ttl=None, backend=None, grace=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.jitter = jitter
+        self.shared = shared
+        self.l1_ttl = l1_ttl
+        self.grace = grace
+        self._backend = backend
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refreshing = set()
+        # Bumped by every invalidation so a refresh that raced one does not write back
+        self._generation = 0
+        with _caches_lock:
+            _caches.add(self)
+
+    @property
+    def backend(self):
+        if self._backend is not None:
+            return self._backend
+        return get_shared_backend() if self.shared else None
+
+    def _backend_key(self, key):
+        return f"{self.name}:{key}"
+
+    def _ttl(self, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and self.jitter:
+            ttl *= 1 + random.uniform(-self.jitter, self.jitter)
+        return ttl
+
+    def _l1_expiry(self, ttl):
+        if self.backend is not None and self.l1_ttl is not None:
+            ttl = self.l1_ttl if ttl is None else min(ttl, self.l1_ttl)
+        return time.time() + ttl if ttl is not None else None
+
+    def _stale_until(self, ttl):
+        if ttl is None or not self.grace:
+            return None
+        return time.time() + ttl + self.grace
+
+    def _lookup(self, key):
+        """(value, stale) from L1 or the backend, or (None, None) when absent"""
+        now = time.time()
+        stale_l1 = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, stale_until, _, _ = entry
+                if expires_at is None or now < expires_at:
+                    self._entries.move_to_end(key)
+                    return value, False
+                if self.backend is None and stale_until is not None and now < stale_until:
+                    stale_l1 = (value,)
+                else:
+                    self._remove(key)
+                    self.expirations += 1
+
+        backend = self.backend
+        if backend is not None:
+            # With a backend, staleness is judged from the shared copy, which sees other workers' invalidations
+            raw = backend.get(self._backend_key(key))
+            if raw is not None:
+                value, tags, *fresh_until = json.loads(raw)
+                fresh_until = fresh_until[0] if fresh_until else None
+                with self._lock:
+                    self.l2_hits += 1
+                if fresh_until is not None and now >= fresh_until:
+                    return value, True
+                ttl = self.ttl if fresh_until is None else fresh_until - now
+                stale_until = fresh_until + self.grace if fresh_until is not None and self.grace else None
+                self._store(key, value, self._l1_expiry(ttl), stale_until, frozenset(tags))
+                return value, False
+            with self._lock:
+                self.l2_misses += 1
+
+        if stale_l1 is not None:
+            return stale_l1[0], True
+        return None, None
+
+    def get(self, key, default=None):
+        """Fresh entries only; see `lookup` for stale-while-revalidate reads"""
+        value, stale = self._lookup(key)
+        with self._lock:
+            if stale is False:
+                self.hits += 1
+                return value
+            self.misses += 1
+        return default
+
+    def lookup(self, key):
+        """
+        (value, stale) for a key, where stale entries are past their TTL but
+        still inside the grace period; (None, False) when there is nothing to serve.
+        """
+        value, stale = self._lookup(key)
+        with self._lock:
+            if stale is None:
+                self.misses += 1
+                return None, False
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+        return value, stale
+
+    def refresh(self, key, loader, ttl=None, tags=(), flight=None):
+        """
+        Recomputes `key` with `loader()` on the refresh pool, at most once at a
+        time per key.  `tags` may be a callable taking the new value.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            generation = self._generation
+
+        def run():
+            try:
+                value = flight.do(key, loader) if flight is not None else loader()
+                with self._lock:
+                    invalidated = self._generation != generation
+                if value is not None and not invalidated:
+                    self.set(key, value, ttl=ttl, tags=tags(value) if callable(tags) else tags)
+                with self._lock:
+                    self.refreshes += 1
+            except Exception as e:
+                with self._lock:
+                    self.refresh_errors += 1
+                print(f"Error refreshing {self.name} entry {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        try:
+            get_refresh_executor().submit(run)
+        except RuntimeError:
+            # Interpreter shutting down; the stale entry simply ages out
+            with self._lock:
+                self._refreshing.discard(key)
+            return False
+        return True
+
+    def get_or_refresh(self, key, loader, ttl=None, tags=(), flight=None):
+        """
+        Stale-while-revalidate read.  Fresh entries are returned as is; stale
+        ones are returned immediately and refreshed in the background; misses
+        call `loader()` inline and cache its result unless it is None.
+        Concurrent misses can share one load through a SingleFlight `flight`.
+        """
+        value, stale = self.lookup(key)
+        if value is not None:
+            if stale:
+                self.refresh(key, loader, ttl=ttl, tags=tags, flight=flight)
+            return value
+
+        def load():
+            with self._lock:
+                entry = self._entries.get(key)
+                # A load that finished just before this one started has already stored it
+                if entry is not None and (entry[1] is None or time.time() < entry[1]):
+                    return entry[0]
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl=ttl, tags=tags(value) if callable(tags) else tags)
+            return value
+
+        return flight.do(key, load) if flight is not None else load()
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[1] is None or time.time() < entry[1])
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl = self._ttl(ttl)
+        tags = frozenset(tags)
+        self._store(key, value, self._l1_expiry(ttl), self._stale_until(ttl), tags)
+
+        backend = self.backend
+        if backend is not None:
+            try:
+                raw = json.dumps([value, list(tags), time.time() + ttl if ttl is not None else None])
+            except (TypeError, ValueError):
+                return
+            backend_key = self._backend_key(key)
+            # The shared copy outlives the TTL by the grace period so any worker can serve it stale
+            backend_ttl = ttl + self.grace if ttl is not None and self.grace else ttl
+            backend.set(backend_key, raw, backend_ttl)
+            if tags:
+                backend.tag(backend_key, [self._backend_key(f"tag:{tag}") for tag in tags], backend_ttl)
+
+    def _store(self, key, value, expires_at, stale_until, tags):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires_at, stale_until, size, tags)
+            self.current_bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (
+            self.current_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, _, size, tags = self._entries.pop(key)
+        self.current_bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def delete(self, key):
+        with self._lock:
+            self._generation += 1
+            if key in self._entries:
+                self._remove(key)
+        if self.backend is not None:
+            self.backend.delete(self._backend_key(key))
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            self._generation += 1
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+        if self.backend is not None:
+            # The backend also knows entries this worker never loaded
+            return max(len(keys), self.backend.invalidate_tag(self._backend_key(f"tag:{tag}")) or 0)
+        return len(keys)
+
+    def expiring(self, within):
+        """Keys that expire in the next `within` seconds, oldest first"""
+        deadline = time.time() + within
+        with self._lock:
+            return [
+                key for key, (_, expires_at, _, _, _) in self._entries.items()
+                if expires_at is not None and expires_at <= deadline
+            ]
+
+    def clear(self):
+        """Empties this process's entries; the shared backend is left untouched"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "shared": self.backend is not None,
+                "l2_hits": self.l2_hits,
+                "l2_misses": self.l2_misses,
+                "stale_hits": self.stale_hits,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors
+            }
+
+_flights = weakref.WeakSet()
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one computation.
+
+    The first caller for a key runs `func`; callers arriving while it is in
+    flight wait for it and get the same result, or the same exception.  The
+    key is released as soon as the computation finishes, so this only
+    de-duplicates overlapping work; caching the result is left to the caller.
+    """
+
+    def __init__(self, name, timeout=None):
+        self.name = name
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        with _caches_lock:
+            _flights.add(self)
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            if not call["done"].wait(self.timeout):
+                # The leader is stuck; compute independently rather than hang the request
+                with self._lock:
+                    self.timeouts += 1
+                return func(*args, **kwargs)
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = func(*args, **kwargs)
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts
+            }
+
+def single_flight(flight, key=None):
+    """Decorator running a function through `flight`, keyed like `cached`"""
+    def wrapper_decorator(func):
+        @wraps(func)
+        def wrapped_func(*args, **kwargs):
+            flight_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return flight.do(flight_key, func, *args, **kwargs)
+
+        wrapped_func.flight = flight
+        return wrapped_func
+    return wrapper_decorator
+
+def cached(cache, key=None, tags=None, ttl=None):
+    """
+    Memoises a function in a BoundedCache.  `key` and `tags` are callables
+    taking the function's arguments; by default the key is the positional
+    and keyword arguments.  `None` results are not cached.
+    """
+    def wrapper_decorator(func):
+        @wraps(func)
+        def wrapped_func(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            result = cache.get(cache_key)
+            if result is None:
+                result = func(*args, **kwargs)
+                if result is not None:
+                    cache.set(cache_key, result, ttl=ttl, tags=tags(*args, **kwargs) if tags else ())
+            return result
+
+        wrapped_func.cache = cache
+        return wrapped_func
+    return wrapper_decorator
+
+def invalidate_product(product_id):
+    """Drops every cached entry tagged with this ProductId, in every live cache"""
+    with _caches_lock:
+        caches = list(_caches)
+    return sum(cache.invalidate_tag(product_id) for cache in caches)
+
+def invalidate_shared_product(product_id, cache_names=PRODUCT_CACHES):
+    """
+    Drops the shared backend's entries tagged with this ProductId for the
+    named caches, whether or not they are live in this process, so scripts
+    that change ratings reach every worker.  Workers still hold their L1
+    copies for up to their `l1_ttl`.  Returns how many entries were dropped.
+    """
+    backend = get_shared_backend()
+    if backend is None:
+        return 0
+    return sum(backend.invalidate_tag(f"{name}:tag:{product_id}") or 0 for name in cache_names)
+
+def clear_all():
+    """Empties every live cache in this process"""
+    with _caches_lock:
+        caches = list(_caches)
+    for cache in caches:
+        cache.clear()
+
+def all_stats():
+    with _caches_lock:
+        caches = sorted(_caches, key=lambda cache: cache.name)
+    stats = {}
+    for cache in caches:
+        name = cache.name
+        suffix = 2
+        while name in stats:
+            name = f"{cache.name}#{suffix}"
+            suffix += 1
+        stats[name] = cache.stats()
+    return stats
+
+def all_flight_stats():
+    with _caches_lock:
+        flights = sorted(_flights, key=lambda flight: flight.name)
+    return {flight.name: flight.stats() for flight in flights}
@@ -0,0 +1,360 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from collaborative_engine import ItemCooccurrenceEngine
+from category_facets import CategoryFacets
+from compact_frames import frame_from_rows, index_positions, factorize_values, memory_report
+
+DEFAULT_IMAGE_URL = "http://localhost:5001/static/images/product-placeholder.jpg"
+
+PRODUCTS_QUERY = text("""
+    SELECT
+        p.ProductId,
+        p.ProductType,
+        p.ProductTitle,
+        p.ImageURL,
+        p.URL,
+        p.price
+    FROM products p
+    WHERE p.ProductId IS NOT NULL
+""")
+
+RATING_AGGREGATES_QUERY = text("""
+    SELECT
+        ps.ProductId,
+        ps.avg_rating,
+        ps.distinct_users as review_count,
+        ps.rating_count,
+        ps.liked_avg,
+        ps.liked_users
+    FROM product_stats ps
+""")
+
+LIKED_RATINGS_QUERY = text("""
+    SELECT ab.UserId, ab.ProductId, ab.Rating
+    FROM amazon_beauty ab
+    WHERE ab.Rating >= 4.0
+        AND ab.UserId IS NOT NULL
+        AND ab.ProductId IS NOT NULL
+""")
+
+def _object_column(series):
+    values = series.to_numpy(dtype=object, copy=True)
+    values[pd.isna(values)] = None
+    return values
+
+class CatalogData:
+    """
+    Immutable column arrays for one load of the catalog.
+
+    Every product gets a dense integer index; all per-product columns are
+    NumPy arrays addressed by that index.  Products that only appear in
+    `amazon_beauty` are kept (so their ratings still link users together)
+    but are flagged out of `in_catalog`.
+    """
+
+    def __init__(self, products, aggregates, liked):
+        product_ids = pd.Index(
+            pd.concat([products['ProductId'], aggregates['ProductId'], pd.Series(liked['ProductId'].unique())])
+            .astype(str)
+            .unique()
+        )
+        self.product_ids = np.asarray(product_ids, dtype=object)
+        self.index = {product_id: i for i, product_id in enumerate(self.product_ids)}
+        n = len(self.product_ids)
+
+        rows = product_ids.get_indexer(products['ProductId'].astype(str))
+        self.in_catalog = np.zeros(n, dtype=bool)
+        self.in_catalog[rows] = True
+
+        type_codes, self.types = pd.factorize(products['ProductType'].fillna('').astype(str))
+        self.types = list(self.types)
+        self.type_codes = np.full(n, -1, dtype=np.int32)
+        self.type_codes[rows] = type_codes
+
+        self.titles = np.full(n, None, dtype=object)
+        self.titles[rows] = _object_column(products['ProductTitle'])
+        self.image_urls = np.full(n, None, dtype=object)
+        self.image_urls[rows] = _object_column(products['ImageURL'])
+        self.urls = np.full(n, None, dtype=object)
+        self.urls[rows] = _object_column(products['URL'])
+        self.price = np.full(n, np.nan, dtype=np.float64)
+        self.price[rows] = pd.to_numeric(products['price'], errors='coerce').to_numpy(dtype=np.float64)
+
+        rows = product_ids.get_indexer(aggregates['ProductId'].astype(str))
+        self.avg_rating = np.zeros(n, dtype=np.float64)
+        self.avg_rating[rows] = aggregates['avg_rating'].astype(float).to_numpy()
+        self.review_count = np.zeros(n, dtype=np.int32)
+        self.review_count[rows] = aggregates['review_count'].astype(int).to_numpy()
+        self.rating_count = np.zeros(n, dtype=np.int32)
+        self.rating_count[rows] = aggregates['rating_count'].astype(int).to_numpy()
+        self.liked_avg = np.zeros(n, dtype=np.float64)
+        self.liked_avg[rows] = aggregates['liked_avg'].astype(float).to_numpy()
+        self.liked_users = np.zeros(n, dtype=np.int32)
+        self.liked_users[rows] = aggregates['liked_users'].astype(int).to_numpy()
+
+        self._build_cooccurrence(product_ids, liked)
+        self._build_orderings()
+        self._type_match_cache = {}
+        self.facets = CategoryFacets(self)
+        # Listing records serialized on first use, ProductId index -> responses.Fragment
+        self.encoded_listings = {}
+
+    def _build_cooccurrence(self, product_ids, liked):
+        # One row per (user, product) so that row counts equal distinct users;
+        # rating sums and row counts keep averages identical to AVG() over rows
+        liked = liked.groupby(
+            ['UserId', 'ProductId'], as_index=False, sort=False, observed=True
+        )['Rating'].agg(['sum', 'count'])
+        users = factorize_values(liked['UserId'])
+        items = index_positions(product_ids, liked['ProductId'])
+        self.cooccurrence = ItemCooccurrenceEngine(
+            self.product_ids,
+            users,
+            items,
+            liked['sum'].to_numpy(),
+            liked['count'].to_numpy(),
+            catalog_mask=self.in_catalog
+        )
+
+    def _build_orderings(self):
+        # Products eligible for content recommendations, best rated first
+        eligible = np.flatnonzero(self.in_catalog & (self.avg_rating >= 4.0))
+        order = np.lexsort((-self.review_count[eligible], -self.avg_rating[eligible]))
+        self.rating_order = eligible[order]
+
+        # Products eligible for trending recommendations, grouped by type
+        self.trend_score = self.liked_users * self.liked_avg
+        eligible = np.flatnonzero(self.in_catalog & (self.liked_users >= 10))
+        order = np.lexsort((
+            -self.liked_avg[eligible],
+            -self.liked_users[eligible],
+            -self.trend_score[eligible],
+            self.type_codes[eligible]
+        ))
+        eligible = eligible[order]
+        self.trend_order = {}
+        if len(eligible):
+            codes = self.type_codes[eligible]
+            bounds = np.flatnonzero(np.diff(codes)) + 1
+            for group in np.split(eligible, bounds):
+                self.trend_order[int(self.type_codes[group[0]])] = group
+
+    def type_match_mask(self, type_code):
+        """Type codes whose ProductType contains the given type (SQL `LIKE '%type%'`)"""
+        mask = self._type_match_cache.get(type_code)
+        if mask is None:
+            needle = self.types[type_code].lower()
+            mask = np.array([needle in t.lower() for t in self.types], dtype=bool)
+            self._type_match_cache[type_code] = mask
+        return mask
+
+    def image_url(self, i):
+        return self.image_urls[i] or DEFAULT_IMAGE_URL
+
+    def price_of(self, i):
+        price = self.price[i]
+        return float(price) if price and not np.isnan(price) else 0.0
+
+    def product_record(self, i):
+        return {
+            "ProductId": self.product_ids[i],
+            "ProductType": self.types[self.type_codes[i]] if self.type_codes[i] >= 0 else None,
+            "ProductTitle": self.titles[i],
+            "ImageURL": self.image_url(i),
+            "price": self.price_of(i)
+        }
+
+    @property
+    def memory_bytes(self):
+        return self.cooccurrence.memory_bytes + self.facets.memory_bytes + sum(
+            value.nbytes for value in vars(self).values()
+            if isinstance(value, np.ndarray)
+        )
+
+class CatalogSnapshot:
+    """
+    In-memory snapshot of `products` and the per-product rating aggregates
+    of `amazon_beauty`, used to answer the content, collaborative and
+    trending recommenders without touching the database.
+
+    The snapshot is rebuilt from scratch on every refresh and swapped in
+    atomically, so readers never see a half-loaded catalog.
+    """
+
+    def __init__(self, engine, refresh_interval=600):
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self.data = None
+        self.loaded_at = None
+        self.load_time = None
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_loaded(self):
+        return self.data is not None
+
+    def contains(self, product_id):
+        data, i = self._lookup(product_id)
+        return i is not None
+
+    def refresh(self):
+        with self._refresh_lock:
+            start_time = time.time()
+            with self.engine.connect() as conn:
+                products = pd.DataFrame(
+                    conn.execute(PRODUCTS_QUERY).fetchall(),
+                    columns=['ProductId', 'ProductType', 'ProductTitle', 'ImageURL', 'URL', 'price']
+                )
+                aggregates = pd.DataFrame(
+                    conn.execute(RATING_AGGREGATES_QUERY).fetchall(),
+                    columns=['ProductId', 'avg_rating', 'review_count', 'rating_count', 'liked_avg', 'liked_users']
+                )
+                # Categorical ids and uint8 ratings: the liked ratings are most of the snapshot's load memory
+                liked = frame_from_rows(conn.execute(LIKED_RATINGS_QUERY).fetchall(), ['UserId', 'ProductId', 'Rating'])
+
+            liked_bytes = memory_report(liked)["bytes"]
+            data = CatalogData(products, aggregates, liked)
+            self.data = data
+            self.loaded_at = time.time()
+            self.load_time = self.loaded_at - start_time
+            print(f"Catalog snapshot loaded: {len(data.product_ids)} products, "
+                  f"{data.cooccurrence.user_counts.nnz} co-rated pairs, "
+                  f"{data.memory_bytes / 1024 / 1024:.1f}MB in {self.load_time:.2f}s "
+                  f"(liked ratings frame {liked_bytes / 1024 / 1024:.1f}MB)")
+            return data
+
+    def detached(self):
+        """A copy sharing the loaded arrays, with no engine and no refresh thread (used after fork)"""
+        snapshot = CatalogSnapshot(None, refresh_interval=self.refresh_interval)
+        snapshot.data = self.data
+        snapshot.loaded_at = self.loaded_at
+        snapshot.load_time = self.load_time
+        return snapshot
+
+    def start_background_refresh(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop,
+            name="catalog-snapshot-refresh",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing catalog snapshot: {str(e)}")
+
+    def _lookup(self, product_id, in_catalog=True):
+        data = self.data
+        if data is None:
+            return None, None
+        i = data.index.get(product_id)
+        if i is None or (in_catalog and not data.in_catalog[i]):
+            return data, None
+        return data, i
+
+    def display_records(self, product_ids):
+        """Product details with all-time rating aggregates, for the products the snapshot knows"""
+        data = self.data
+        if data is None:
+            return {}
+
+        records = {}
+        for product_id in product_ids:
+            i = data.index.get(product_id)
+            if i is None or not data.in_catalog[i]:
+                continue
+            record = data.product_record(i)
+            record.update({
+                "Rating": float(data.avg_rating[i]),
+                "ReviewCount": int(data.review_count[i])
+            })
+            records[product_id] = record
+        return records
+
+    def similar_products(self, product_id, num_recommendations=4):
+        """Returns None when the product is not part of the snapshot"""
+        data, i = self._lookup(product_id)
+        if i is None:
+            return None
+        price = data.price[i]
+        candidates = data.rating_order
+        if np.isnan(price):
+            return []
+
+        type_mask = data.type_match_mask(data.type_codes[i])
+        candidate_prices = data.price[candidates]
+        mask = (
+            type_mask[data.type_codes[candidates]]
+            & (candidate_prices >= price * 0.5)
+            & (candidate_prices <= price * 1.5)
+            & (candidates != i)
+        )
+        selected = candidates[mask][:num_recommendations]
+
+        recommended_products = []
+        for j in selected:
+            product = data.product_record(j)
+            product.update({
+                "Rating": float(data.avg_rating[j]),
+                "ReviewCount": int(data.review_count[j]),
+                "similarity_score": 1.0
+            })
+            recommended_products.append(product)
+        return recommended_products
+
+    def collaborative_recommendations(self, product_id, num_recommendations=4):
+        data, i = self._lookup(product_id, in_catalog=False)
+        if i is None:
+            return None
+        candidates, user_count, avg_rating = data.cooccurrence.neighbors(product_id, num_recommendations)
+
+        recommendations = []
+        for j, count, rating in zip(candidates, user_count, avg_rating):
+            product = data.product_record(j)
+            product.update({
+                "Rating": float(rating),
+                "UserCount": int(count),
+                "similarity_score": 0.8
+            })
+            recommendations.append(product)
+        return recommendations
+
+    def trending_recommendations(self, product_id, num_recommendations=4):
+        data, i = self._lookup(product_id)
+        if i is None:
+            return None
+        ranked = data.trend_order.get(int(data.type_codes[i]))
+        if ranked is None:
+            return []
+        ranked = ranked[:num_recommendations + 1]
+        ranked = ranked[ranked != i][:num_recommendations]
+
+        recommendations = []
+        for j in ranked:
+            trend_score = float(data.trend_score[j])
+            product = data.product_record(j)
+            product.update({
+                "Rating": float(data.liked_avg[j]),
+                "ReviewCount": int(data.liked_users[j]),
+                "TrendScore": trend_score,
+                "similarity_score": min(trend_score / 1000, 1.0)
+            })
+            recommendations.append(product)
+        return recommendations
@@ -0,0 +1,142 @@
+import numpy as np
+from product_categories import CATEGORY_MAPPING, categorize
+
+# Sort name -> (primary, secondary) columns with descending flags; ProductId breaks the remaining ties
+SORTS = {
+    'rating': (('avg_rating', True), ('rating_count', True)),
+    'popularity': (('rating_count', True), ('avg_rating', True)),
+    'price_asc': (('price', False), ('avg_rating', True)),
+    'price_desc': (('price', True), ('avg_rating', True))
+}
+
+class _CategoryIndex:
+    """Listable products of one category, with one presorted ordering per sort"""
+
+    def __init__(self, data, members, pid_rank):
+        # `members` are snapshot indexes in ascending order; everything else is addressed by position in it
+        self.members = members
+        self.price = data.price[members]
+        self.avg_rating = data.avg_rating[members]
+        self.rating_count = data.rating_count[members].astype(np.float64)
+
+        self.type_codes, self.local_types = np.unique(data.type_codes[members], return_inverse=True)
+        self.local_types = self.local_types.astype(np.int32)
+        # Inverted lists: positions of each ProductType, OR-ed into a bitmap when filtering by type
+        order = np.argsort(self.local_types, kind='stable')
+        bounds = np.flatnonzero(np.diff(self.local_types[order])) + 1
+        self.type_positions = {
+            int(self.type_codes[self.local_types[group[0]]]): group
+            for group in np.split(order, bounds) if len(group)
+        }
+
+        self.ranks = pid_rank[members]
+        self.orders = {}
+        self.sort_keys = {}
+        for sort, ((primary, primary_desc), (secondary, secondary_desc)) in SORTS.items():
+            # Keys negated for descending columns, so every ordering is ascending on its keys
+            primary_key = -getattr(self, primary) if primary_desc else getattr(self, primary)
+            secondary_key = -getattr(self, secondary) if secondary_desc else getattr(self, secondary)
+            order = np.lexsort((self.ranks, secondary_key, primary_key)).astype(np.int32)
+            self.orders[sort] = order
+            self.sort_keys[sort] = (primary_key, secondary_key)
+
+    @property
+    def memory_bytes(self):
+        arrays = [self.members, self.price, self.avg_rating, self.rating_count, self.local_types, self.ranks]
+        arrays += list(self.orders.values()) + list(self.type_positions.values())
+        return sum(array.nbytes for array in arrays)
+
+class CategoryFacets:
+    """
+    Filtered, sorted category listings answered from the catalog snapshot.
+
+    Built once per snapshot load: each category keeps its listable products
+    (in the catalog, priced and rated, the same rows as the SQL listing) and
+    one presorted position array per entry of SORTS.  A query builds a
+    boolean mask from the price and rating bounds and the ProductType lists,
+    then walks the presorted order through it, so no query sorts anything.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.type_index = {product_type: code for code, product_type in enumerate(data.types)}
+        # ProductId order for the final tie-break, matching the SQL ORDER BY
+        self.pid_rank = np.empty(len(data.product_ids), dtype=np.int64)
+        self.pid_rank[np.argsort(data.product_ids.astype(str), kind='stable')] = np.arange(len(data.product_ids))
+
+        listable = data.in_catalog & (data.type_codes >= 0) & (data.price > 0) & (data.rating_count > 0)
+        type_categories = [set(categorize(product_type)) for product_type in data.types]
+        self.categories = {}
+        for category in CATEGORY_MAPPING:
+            in_category = np.array([category in categories for categories in type_categories] + [False], dtype=bool)
+            members = np.flatnonzero(listable & in_category[data.type_codes])
+            self.categories[category] = _CategoryIndex(data, members, self.pid_rank)
+
+    @property
+    def memory_bytes(self):
+        return self.pid_rank.nbytes + sum(index.memory_bytes for index in self.categories.values())
+
+    def _resume(self, index, sort, selected, after):
+        """Position in `selected` just past the cursor row (primary, secondary, ProductId)"""
+        (_, primary_desc), (_, secondary_desc) = SORTS[sort]
+        primary_key, secondary_key = (key[selected] for key in index.sort_keys[sort])
+        primary = -after[0] if primary_desc else after[0]
+        secondary = -after[1] if secondary_desc else after[1]
+
+        # Binary searches down the presorted keys to the block of rows tied with the cursor row
+        block_start = np.searchsorted(primary_key, primary, side='left')
+        block_end = np.searchsorted(primary_key, primary, side='right')
+        block = secondary_key[block_start:block_end]
+        tie_start = block_start + np.searchsorted(block, secondary, side='left')
+        tie_end = block_start + np.searchsorted(block, secondary, side='right')
+
+        i = self.data.index.get(after[2])
+        if i is None:
+            # Cursor product left the catalog; resume after all of its ties
+            return int(tie_end)
+        ranks = index.ranks[selected[tie_start:tie_end]]
+        return int(tie_start + np.searchsorted(ranks, self.pid_rank[i], side='right'))
+
+    def query(self, category, sort='rating', min_price=None, max_price=None, min_rating=None,
+              product_types=None, offset=0, limit=20, after=None):
+        """
+        One page of a category as (snapshot indexes, total matches, more pages
+        left, facets).  `after` is a decoded cursor and takes precedence over
+        `offset`.  Facets count ProductTypes and give the price range under
+        every filter except the ProductType one.
+        """
+        index = self.categories[category]
+        mask = np.ones(len(index.members), dtype=bool)
+        if min_price is not None:
+            mask &= index.price >= min_price
+        if max_price is not None:
+            mask &= index.price <= max_price
+        if min_rating is not None:
+            mask &= index.avg_rating >= min_rating
+
+        type_counts = np.bincount(index.local_types[mask], minlength=len(index.type_codes))
+        prices = index.price[mask]
+        facets = {
+            "types": [
+                {"ProductType": self.data.types[index.type_codes[local]], "count": int(type_counts[local])}
+                for local in np.argsort(-type_counts, kind='stable') if type_counts[local]
+            ],
+            "price": {
+                "min": float(prices.min()) if len(prices) else None,
+                "max": float(prices.max()) if len(prices) else None
+            }
+        }
+
+        if product_types:
+            type_mask = np.zeros(len(index.members), dtype=bool)
+            for product_type in product_types:
+                code = self.type_index.get(product_type)
+                if code is not None and code in index.type_positions:
+                    type_mask[index.type_positions[code]] = True
+            mask &= type_mask
+
+        order = index.orders[sort]
+        selected = order[mask[order]]
+        start = self._resume(index, sort, selected, after) if after is not None else offset
+        page = selected[start:start + limit]
+        return index.members[page], len(selected), start + limit < len(selected), facets
@@ -0,0 +1,115 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sqlalchemy import text
+from compact_frames import frame_from_rows, index_positions, factorize_values
+
+LIKED_RATINGS_QUERY = text("""
+    SELECT ab.UserId, ab.ProductId, ab.Rating
+    FROM amazon_beauty ab
+    WHERE ab.Rating >= 4.0
+        AND ab.UserId IS NOT NULL
+        AND ab.ProductId IS NOT NULL
+""")
+
+CATALOG_IDS_QUERY = text("""
+    SELECT ProductId FROM products WHERE ProductId IS NOT NULL
+""")
+
+class ItemCooccurrenceEngine:
+    """
+    Item-item collaborative model over the >=4.0 ratings of `amazon_beauty`.
+
+    A CSR user x item matrix of liked ratings is built once and multiplied
+    into item x item matrices holding, for every pair (i, j), the number of
+    distinct users who liked both products and the average rating those
+    users gave j.  A recommendation is then a single CSR row slice plus an
+    `argpartition`, independent of how many ratings the table holds.
+    """
+
+    def __init__(self, product_ids, users, items, rating_sums, rating_rows, catalog_mask=None):
+        start_time = time.time()
+        self.product_ids = np.asarray(product_ids, dtype=object)
+        self.index = {product_id: i for i, product_id in enumerate(self.product_ids)}
+        n_items = len(self.product_ids)
+        n_users = int(users.max()) + 1 if len(users) else 0
+        shape = (n_users, n_items)
+
+        liked = sparse.csr_matrix((np.ones(len(users), dtype=np.int32), (users, items)), shape=shape)
+        sums = sparse.csr_matrix((np.asarray(rating_sums, dtype=np.float64), (users, items)), shape=shape)
+        rows = sparse.csr_matrix((np.asarray(rating_rows, dtype=np.float64), (users, items)), shape=shape)
+
+        liked_t = liked.T.tocsr()
+        self.user_counts = (liked_t @ liked).tocsr()
+        rating_sums = (liked_t @ sums).tocsr()
+        rating_rows = (liked_t @ rows).tocsr()
+        for matrix in (self.user_counts, rating_sums, rating_rows):
+            matrix.sort_indices()
+
+        self.avg_ratings = sparse.csr_matrix(
+            (rating_sums.data / rating_rows.data,
+             self.user_counts.indices, self.user_counts.indptr),
+            shape=self.user_counts.shape
+        )
+        self.catalog_mask = (
+            np.asarray(catalog_mask, dtype=bool)
+            if catalog_mask is not None else np.ones(n_items, dtype=bool)
+        )
+        self.build_time = time.time() - start_time
+
+    @classmethod
+    def from_frame(cls, liked, catalog_ids=None):
+        """Builds the model from a DataFrame of UserId, ProductId, Rating rows"""
+        liked = liked.groupby(
+            ['UserId', 'ProductId'], as_index=False, sort=False, observed=True
+        )['Rating'].agg(['sum', 'count'])
+        product_ids = pd.Index(pd.Series(liked['ProductId'].unique()).astype(str).unique())
+        if catalog_ids is not None:
+            product_ids = product_ids.append(pd.Index(catalog_ids).astype(str).difference(product_ids))
+        users = factorize_values(liked['UserId'])
+        items = index_positions(product_ids, liked['ProductId'])
+        catalog_mask = None
+        if catalog_ids is not None:
+            catalog_mask = product_ids.isin(pd.Index(catalog_ids).astype(str))
+        return cls(product_ids, users, items, liked['sum'].to_numpy(), liked['count'].to_numpy(), catalog_mask)
+
+    @classmethod
+    def from_engine(cls, engine):
+        with engine.connect() as conn:
+            liked = frame_from_rows(conn.execute(LIKED_RATINGS_QUERY).fetchall(), ['UserId', 'ProductId', 'Rating'])
+            catalog_ids = [row.ProductId for row in conn.execute(CATALOG_IDS_QUERY)]
+        return cls.from_frame(liked, catalog_ids)
+
+    def neighbors(self, product_id, num_recommendations=4):
+        """
+        Top products co-liked with `product_id` as (indices, user_counts, avg_ratings),
+        ordered by user count then average rating.  Returns None for unknown products.
+        """
+        i = self.index.get(product_id)
+        if i is None:
+            return None
+
+        start, end = self.user_counts.indptr[i], self.user_counts.indptr[i + 1]
+        candidates = self.user_counts.indices[start:end]
+        user_count = self.user_counts.data[start:end]
+        avg_rating = self.avg_ratings.data[start:end]
+
+        mask = (candidates != i) & self.catalog_mask[candidates] & (avg_rating >= 4.0)
+        candidates, user_count, avg_rating = candidates[mask], user_count[mask], avg_rating[mask]
+
+        if 0 < num_recommendations < len(candidates):
+            # Ratings never exceed 5, so a 10x weight keeps user count as the primary key
+            key = user_count * 10.0 + avg_rating
+            top = np.argpartition(-key, num_recommendations - 1)[:num_recommendations]
+            candidates, user_count, avg_rating = candidates[top], user_count[top], avg_rating[top]
+
+        order = np.lexsort((-avg_rating, -user_count))[:num_recommendations]
+        return candidates[order], user_count[order], avg_rating[order]
+
+    @property
+    def memory_bytes(self):
+        return sum(
+            matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            for matrix in (self.user_counts, self.avg_ratings)
+        )
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# Storage kind of each ratings / catalog column we hold in memory
+COLUMN_KINDS = {
+    'UserId': 'category',
+    'ProductId': 'category',
+    'ProductType': 'category',
+    'URL': 'category',
+    'Rating': 'rating',
+    'Timestamp': 'timestamp',
+    'ReviewCount': 'count',
+    'AvgRating': 'float32'
+}
+
+# A column becomes categorical only if it repeats enough for codes plus one copy of each value to be smaller
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+_INT32 = np.iinfo(np.int32)
+
+def _is_categorical(series):
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+def compact_series(series, kind):
+    """
+    `series` in the smallest dtype that keeps its values exact:
+
+    - category: categorical codes, when the values repeat (see CATEGORY_MAX_UNIQUE_RATIO)
+    - rating: uint8 for whole-number ratings, float32 otherwise
+    - timestamp / count: int32 when every value fits, unchanged otherwise
+    - float32: float32
+    """
+    if kind == 'category':
+        if _is_categorical(series) or len(series) == 0:
+            return series
+        if series.nunique(dropna=False) <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+            return series.astype('category')
+        return series
+
+    values = pd.to_numeric(series, errors='coerce')
+    if kind == 'rating':
+        present = values.dropna()
+        if len(present) == len(values) and ((present % 1 == 0) & (present >= 0) & (present <= 255)).all():
+            return values.astype(np.uint8)
+        return values.astype(np.float32)
+    if kind in ('timestamp', 'count'):
+        if values.isna().any() or (len(values) and (values.min() < _INT32.min or values.max() > _INT32.max)):
+            return values
+        return values.astype(np.int32)
+    if kind == 'float32':
+        return values.astype(np.float32)
+    raise ValueError(f"Unknown column kind: {kind}")
+
+def compact(frame, kinds=COLUMN_KINDS):
+    """A copy of `frame` with every column named in `kinds` compacted; other columns are kept as they are"""
+    return frame.assign(**{
+        column: compact_series(frame[column], kind)
+        for column, kind in kinds.items() if column in frame.columns
+    })
+
+def frame_from_rows(rows, columns, kinds=COLUMN_KINDS):
+    """
+    A compact DataFrame from DB-API rows, built column by column so the
+    full frame of Python objects never exists at once.
+    """
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    data = {}
+    for column, values in zip(columns, zip(*rows)):
+        series = pd.Series(values, dtype=object)
+        data[column] = compact_series(series, kinds[column]) if column in kinds else series.infer_objects()
+    return pd.DataFrame(data)
+
+def index_positions(index, series):
+    """Positions in `index` of every value of `series`, looked up once per category for categoricals"""
+    if _is_categorical(series):
+        codes = series.cat.codes.to_numpy()
+        positions = index.get_indexer(series.cat.categories.astype(str))
+        return np.where(codes >= 0, positions[codes], -1)
+    return index.get_indexer(series.astype(str))
+
+def factorize_values(series):
+    """Dense codes in order of first appearance, as pd.factorize over the string values"""
+    if _is_categorical(series):
+        codes, _ = pd.factorize(series.cat.codes.to_numpy())
+        return codes
+    codes, _ = pd.factorize(series.astype(str))
+    return codes
+
+def memory_report(frame):
+    """Deep memory usage of a frame, total and per column"""
+    usage = frame.memory_usage(deep=True, index=False)
+    total = int(usage.sum())
+    return {
+        "rows": len(frame),
+        "bytes": total,
+        "bytes_per_row": total / len(frame) if len(frame) else 0.0,
+        "columns": {column: int(size) for column, size in usage.items()},
+        "dtypes": {column: str(dtype) for column, dtype in frame.dtypes.items()}
+    }
+
+def format_memory_report(label, before, after):
+    return (f"{label}: {before['bytes'] / 1024 / 1024:.1f}MB -> {after['bytes'] / 1024 / 1024:.1f}MB "
+            f"({before['bytes_per_row']:.0f} -> {after['bytes_per_row']:.0f} bytes/row)")
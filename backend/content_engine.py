@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.decomposition import TruncatedSVD
+from ann_index import IVFIndex, normalize_rows
+from sqlalchemy import text
+
+CONTENT_NEIGHBORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'content_neighbors')
+
+PRODUCT_TEXT_QUERY = text("""
+    SELECT ProductId, ProductTitle, ProductType
+    FROM products
+    WHERE ProductId IS NOT NULL
+""")
+
+class ContentSimilarityEngine:
+    """
+    TF-IDF content similarity over ProductTitle and ProductType.
+
+    The L2-normalised TF-IDF matrix stays sparse; cosine top-K neighbours are
+    computed block by block (`X[block] @ X.T`) and reduced per row with
+    `argpartition`, so the N x N similarity matrix is never materialised.
+    Neighbour lists are persisted as plain .npy files and loaded with mmap.
+
+    For catalogs too large for exact neighbour lists, `build_ann` projects the
+    TF-IDF rows to dense embeddings and answers queries through an IVF index.
+    """
+
+    def __init__(self, top_k=50, block_size=256, **tfidf_params):
+        self.top_k = top_k
+        self.block_size = block_size
+        self.tfidf_params = {
+            'analyzer': 'word',
+            'ngram_range': (1, 2),
+            'min_df': 2,
+            'max_features': 50000,
+            'stop_words': 'english',
+            'dtype': np.float32,
+            **tfidf_params
+        }
+        self.product_ids = None
+        self.index = {}
+        self.neighbors_idx = None
+        self.neighbors_score = None
+        self.matrix = None
+        self.vectorizer = None
+        self.ann_index = None
+
+    def fit(self, product_ids, titles, product_types, exact=True):
+        start_time = time.time()
+        documents = [
+            f"{title or ''} {product_type or ''}"
+            for title, product_type in zip(titles, product_types)
+        ]
+        self.vectorizer = TfidfVectorizer(**self.tfidf_params)
+        self.matrix = self.vectorizer.fit_transform(documents).tocsr()
+        self._set_product_ids(product_ids)
+        if exact:
+            self.neighbors_idx, self.neighbors_score = self._compute_neighbors()
+        print(f"Content engine fitted on {len(self.product_ids)} products, "
+              f"{len(self.vectorizer.vocabulary_)} terms in {time.time() - start_time:.1f}s")
+        return self
+
+    @classmethod
+    def from_engine(cls, engine, exact=True, **kwargs):
+        with engine.connect() as conn:
+            rows = conn.execute(PRODUCT_TEXT_QUERY).fetchall()
+        products = pd.DataFrame(rows, columns=['ProductId', 'ProductTitle', 'ProductType'])
+        return cls(**kwargs).fit(
+            products['ProductId'].astype(str).to_numpy(),
+            products['ProductTitle'].tolist(),
+            products['ProductType'].tolist(),
+            exact=exact
+        )
+
+    def embed(self, dim=128, seed=0):
+        """Dense L2-normalised product embeddings from a truncated SVD of the TF-IDF matrix"""
+        dim = min(dim, self.matrix.shape[1] - 1)
+        svd = TruncatedSVD(n_components=dim, random_state=seed)
+        return normalize_rows(svd.fit_transform(self.matrix))
+
+    def build_ann(self, dim=128, **ivf_params):
+        self.ann_index = IVFIndex(**ivf_params).fit(self.embed(dim))
+        return self.ann_index
+
+    def _set_product_ids(self, product_ids):
+        product_ids = np.asarray(product_ids)
+        self.product_ids = product_ids if product_ids.dtype.kind == 'U' else product_ids.astype(str)
+        self.index = {product_id: i for i, product_id in enumerate(self.product_ids)}
+
+    def _compute_neighbors(self):
+        n = self.matrix.shape[0]
+        k = min(self.top_k, max(n - 1, 0))
+        neighbors_idx = np.full((n, k), -1, dtype=np.int32)
+        neighbors_score = np.zeros((n, k), dtype=np.float32)
+        transposed = self.matrix.T.tocsr()
+
+        for start in range(0, n, self.block_size):
+            end = min(start + self.block_size, n)
+            block = (self.matrix[start:end] @ transposed).tocsr()
+
+            for row in range(end - start):
+                row_start, row_end = block.indptr[row], block.indptr[row + 1]
+                columns = block.indices[row_start:row_end]
+                scores = block.data[row_start:row_end]
+
+                keep = columns != start + row
+                columns, scores = columns[keep], scores[keep]
+                if len(columns) > k:
+                    top = np.argpartition(-scores, k - 1)[:k]
+                    columns, scores = columns[top], scores[top]
+
+                order = np.argsort(-scores, kind='stable')
+                neighbors_idx[start + row, :len(order)] = columns[order]
+                neighbors_score[start + row, :len(order)] = scores[order]
+
+        return neighbors_idx, neighbors_score
+
+    def neighbors(self, product_id, num_neighbors=None):
+        """Most similar products as (product_ids, cosine scores), or None for unknown products"""
+        i = self.index.get(product_id)
+        if i is None:
+            return None
+
+        if self.neighbors_idx is None:
+            if self.ann_index is None:
+                return None
+            columns, scores = self.ann_index.search(
+                self.ann_index.vector(i), k=num_neighbors or self.top_k, exclude=i
+            )
+            valid = scores > 0
+            return self.product_ids[columns[valid]], scores[valid]
+
+        columns = np.asarray(self.neighbors_idx[i][:num_neighbors])
+        scores = np.asarray(self.neighbors_score[i][:num_neighbors])
+        valid = (columns >= 0) & (scores > 0)
+        return self.product_ids[columns[valid]], scores[valid]
+
+    def save(self, path=CONTENT_NEIGHBORS_PATH):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'product_ids.npy'), self.product_ids)
+        if self.neighbors_idx is not None:
+            np.save(os.path.join(path, 'neighbors_idx.npy'), self.neighbors_idx)
+            np.save(os.path.join(path, 'neighbors_score.npy'), self.neighbors_score)
+        if self.ann_index is not None:
+            self.ann_index.save(os.path.join(path, 'ivf'))
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'top_k': self.top_k,
+                'products': len(self.product_ids),
+                'exact': self.neighbors_idx is not None,
+                'ann': self.ann_index is not None,
+                'built_at': time.time()
+            }, f)
+
+    @classmethod
+    def load(cls, path=CONTENT_NEIGHBORS_PATH, mmap=True):
+        mmap_mode = 'r' if mmap else None
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        engine = cls(top_k=meta['top_k'])
+        engine._set_product_ids(np.load(os.path.join(path, 'product_ids.npy'), mmap_mode=mmap_mode))
+        if meta.get('exact', True):
+            engine.neighbors_idx = np.load(os.path.join(path, 'neighbors_idx.npy'), mmap_mode=mmap_mode)
+            engine.neighbors_score = np.load(os.path.join(path, 'neighbors_score.npy'), mmap_mode=mmap_mode)
+        if meta.get('ann'):
+            engine.ann_index = IVFIndex.load(os.path.join(path, 'ivf'), mmap=mmap)
+        return engine
+
+    @staticmethod
+    def exists(path=CONTENT_NEIGHBORS_PATH):
+        return os.path.exists(os.path.join(path, 'meta.json'))
@@ -0,0 +1,113 @@
+import time
+from sqlalchemy import text, bindparam
+
+CATEGORY_MAPPING = {
+    'makeup': [
+        '%Eyeliner%', '%Kajal%', '%Lipstick%', '%Foundation%',
+        '%Mascara%', '%Eye Shadow%', '%Concealer%', '%Blush%',
+        '%Compact%', '%Powder%', '%Nail%', '%Makeup%'
+    ],
+    'skincare': [
+        '%Face%', '%Skin%', '%Cream%', '%Moisturizer%',
+        '%Serum%', '%Mask%', '%Facial%', '%Cleanser%',
+        '%Toner%', '%Lotion%'
+    ],
+    'haircare': [
+        '%Hair%', '%Shampoo%', '%Conditioner%', '%Scalp%'
+    ],
+    'fragrance': [
+        '%Perfume%', '%Fragrance%', '%Body Spray%',
+        '%Deodorant%', '%Scent%'
+    ],
+    'miscellaneous': [
+        '%Tool%', '%Kit%', '%Accessory%', '%Accessories%',
+        '%Brush%', '%Applicator%', '%Beauty Tool%', '%Makeup Tool%'
+    ]
+}
+
+# The LIKE patterns above are all '%term%', i.e. case-insensitive substring matches
+_CATEGORY_TERMS = {
+    category: [term.strip('%').lower() for term in terms]
+    for category, terms in CATEGORY_MAPPING.items()
+}
+
+# A product can fall in several categories (e.g. a makeup brush), hence a mapping table
+PRODUCT_CATEGORIES_DDL = """
+    CREATE TABLE IF NOT EXISTS product_categories (
+        category VARCHAR(32) NOT NULL,
+        ProductId VARCHAR(255) NOT NULL,
+        PRIMARY KEY (category, ProductId),
+        INDEX idx_category_product (ProductId)
+    )
+"""
+
+PRODUCT_TYPES_QUERY = "SELECT ProductId, ProductType FROM products WHERE ProductId IS NOT NULL"
+
+INSERT_CATEGORY = text("""
+    INSERT INTO product_categories (category, ProductId)
+    VALUES (:category, :product_id)
+""")
+
+def categorize(product_type):
+    """Categories whose CATEGORY_MAPPING patterns match a ProductType"""
+    if not product_type:
+        return []
+    product_type = str(product_type).lower()
+    return [
+        category for category, terms in _CATEGORY_TERMS.items()
+        if any(term in product_type for term in terms)
+    ]
+
+def create_product_categories_table(conn):
+    conn.execute(text(PRODUCT_CATEGORIES_DDL))
+
+def assign_categories(conn, product_id, product_type):
+    """Rewrites one product's categories inside the caller's transaction"""
+    conn.execute(
+        text("DELETE FROM product_categories WHERE ProductId = :product_id"),
+        {"product_id": product_id}
+    )
+    rows = [{"category": category, "product_id": product_id} for category in categorize(product_type)]
+    if rows:
+        conn.execute(INSERT_CATEGORY, rows)
+    return [row["category"] for row in rows]
+
+def refresh_product_categories(engine, product_ids=None):
+    """
+    Recomputes category membership from products.ProductType, for every
+    product or only for `product_ids`.  Used by the ingest scripts and to
+    backfill the table for products that predate it.
+    """
+    start_time = time.time()
+    with engine.connect() as conn:
+        with conn.begin():
+            create_product_categories_table(conn)
+            if product_ids is None:
+                products = conn.execute(text(PRODUCT_TYPES_QUERY)).fetchall()
+                conn.execute(text("DELETE FROM product_categories"))
+            else:
+                product_ids = list(product_ids)
+                if not product_ids:
+                    return 0
+                products = conn.execute(
+                    text(f"{PRODUCT_TYPES_QUERY} AND ProductId IN :product_ids")
+                    .bindparams(bindparam("product_ids", expanding=True)),
+                    {"product_ids": product_ids}
+                ).fetchall()
+                conn.execute(
+                    text("DELETE FROM product_categories WHERE ProductId IN :product_ids")
+                    .bindparams(bindparam("product_ids", expanding=True)),
+                    {"product_ids": product_ids}
+                )
+
+            rows = [
+                {"category": category, "product_id": row.ProductId}
+                for row in products
+                for category in categorize(row.ProductType)
+            ]
+            if rows:
+                conn.execute(INSERT_CATEGORY, rows)
+
+    print(f"product_categories refreshed: {len(rows)} memberships for {len(products)} products "
+          f"in {time.time() - start_time:.1f}s")
+    return len(rows)
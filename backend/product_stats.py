@@ -0,0 +1,92 @@
+import time
+from sqlalchemy import text, bindparam
+
+PRODUCT_STATS_DDL = """
+    CREATE TABLE IF NOT EXISTS product_stats (
+        ProductId VARCHAR(255) NOT NULL PRIMARY KEY,
+        rating_sum DOUBLE NOT NULL DEFAULT 0,
+        rating_count INT NOT NULL DEFAULT 0,
+        distinct_users INT NOT NULL DEFAULT 0,
+        liked_sum DOUBLE NOT NULL DEFAULT 0,
+        liked_count INT NOT NULL DEFAULT 0,
+        liked_users INT NOT NULL DEFAULT 0,
+        rating_1 INT NOT NULL DEFAULT 0,
+        rating_2 INT NOT NULL DEFAULT 0,
+        rating_3 INT NOT NULL DEFAULT 0,
+        rating_4 INT NOT NULL DEFAULT 0,
+        rating_5 INT NOT NULL DEFAULT 0,
+        avg_rating DOUBLE AS (CASE WHEN rating_count > 0 THEN rating_sum / rating_count ELSE 0 END) STORED,
+        liked_avg DOUBLE AS (CASE WHEN liked_count > 0 THEN liked_sum / liked_count ELSE 0 END) STORED,
+        INDEX idx_avg_rating (avg_rating),
+        INDEX idx_liked_users (liked_users)
+    )
+"""
+
+STATS_COLUMNS = """
+    ProductId, rating_sum, rating_count, distinct_users,
+    liked_sum, liked_count, liked_users,
+    rating_1, rating_2, rating_3, rating_4, rating_5
+"""
+
+# Same aggregates the read queries used to compute on every request
+STATS_SELECT = """
+    SELECT
+        ab.ProductId,
+        SUM(ab.Rating),
+        COUNT(ab.Rating),
+        COUNT(DISTINCT ab.UserId),
+        SUM(CASE WHEN ab.Rating >= 4.0 THEN ab.Rating ELSE 0 END),
+        SUM(CASE WHEN ab.Rating >= 4.0 THEN 1 ELSE 0 END),
+        COUNT(DISTINCT CASE WHEN ab.Rating >= 4.0 THEN ab.UserId END),
+        SUM(CASE WHEN ab.Rating < 1.5 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN ab.Rating >= 1.5 AND ab.Rating < 2.5 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN ab.Rating >= 2.5 AND ab.Rating < 3.5 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN ab.Rating >= 3.5 AND ab.Rating < 4.5 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN ab.Rating >= 4.5 THEN 1 ELSE 0 END)
+    FROM amazon_beauty ab
+    WHERE ab.ProductId IS NOT NULL
+        AND ab.Rating IS NOT NULL
+"""
+
+def create_product_stats_table(conn):
+    conn.execute(text(PRODUCT_STATS_DDL))
+
+def refresh_product_stats(engine, product_ids=None):
+    """
+    Recomputes the rollup from amazon_beauty, for every product or only for
+    `product_ids`.  Used by the ingest scripts to backfill the table and to
+    bring the changed products up to date after each load.
+    """
+    start_time = time.time()
+    with engine.connect() as conn:
+        with conn.begin():
+            create_product_stats_table(conn)
+            if product_ids is None:
+                conn.execute(text("DELETE FROM product_stats"))
+                conn.execute(text(f"""
+                    INSERT INTO product_stats ({STATS_COLUMNS})
+                    {STATS_SELECT}
+                    GROUP BY ab.ProductId
+                """))
+            else:
+                product_ids = list(product_ids)
+                if not product_ids:
+                    return 0
+                conn.execute(
+                    text("DELETE FROM product_stats WHERE ProductId IN :product_ids")
+                    .bindparams(bindparam("product_ids", expanding=True)),
+                    {"product_ids": product_ids}
+                )
+                conn.execute(
+                    text(f"""
+                        INSERT INTO product_stats ({STATS_COLUMNS})
+                        {STATS_SELECT}
+                            AND ab.ProductId IN :product_ids
+                        GROUP BY ab.ProductId
+                    """).bindparams(bindparam("product_ids", expanding=True)),
+                    {"product_ids": product_ids}
+                )
+            count = conn.execute(text("SELECT COUNT(*) FROM product_stats")).scalar()
+
+    print(f"product_stats refreshed: {count} products in {time.time() - start_time:.1f}s")
+    return count
@@ -0,0 +1,171 @@
+import gzip
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+import numpy as np
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent as they are; compressing them costs more than it saves
+COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', 5))
+
+_stats_lock = threading.Lock()
+_stats = {
+    "responses": 0,
+    "body_bytes": 0,
+    "sent_bytes": 0,
+    "encode_time": 0.0,
+    "compress_time": 0.0,
+    "encodings": {"br": 0, "gzip": 0, "identity": 0}
+}
+
+class Fragment:
+    """JSON already serialized to bytes, spliced verbatim into a response"""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(value):
+        """Compact UTF-8 JSON bytes, with orjson when it is installed"""
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(value):
+        """Compact UTF-8 JSON bytes, with orjson when it is installed"""
+        return json.dumps(value, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def encode_fragment(value):
+    return Fragment(dumps(value))
+
+def _encode_value(value):
+    if isinstance(value, Fragment):
+        return value.data
+    if isinstance(value, list) and any(isinstance(item, Fragment) for item in value):
+        return b'[' + b','.join(
+            item.data if isinstance(item, Fragment) else dumps(item) for item in value
+        ) + b']'
+    return dumps(value)
+
+def encode_payload(payload):
+    """
+    A response payload as JSON bytes.  Top-level values, or the items of a
+    top-level list, may be Fragments; their bytes are reused as they are
+    instead of being serialized again.
+    """
+    if not isinstance(payload, dict):
+        return _encode_value(payload)
+    if not any(isinstance(value, (Fragment, list)) for value in payload.values()):
+        return dumps(payload)
+    return b'{' + b','.join(
+        dumps(str(key)) + b':' + _encode_value(value) for key, value in payload.items()
+    ) + b'}'
+
+def _accepted_encodings(header):
+    """Accept-Encoding as {coding: q}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def negotiate_encoding(header, size):
+    """'br', 'gzip' or 'identity' for a body of `size` bytes, by the client's preferences"""
+    if size < COMPRESS_MIN_BYTES:
+        return 'identity'
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = 'identity', 0.0
+    # Earlier candidates win ties, so brotli is preferred when both are equally acceptable
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+def json_response(payload, status=200):
+    """
+    Drop-in for `jsonify(payload), status`: serializes with `dumps`, splices
+    in pre-serialized Fragments, and compresses bodies above
+    COMPRESS_MIN_BYTES with the best encoding the client accepts.
+    """
+    start_time = time.perf_counter()
+    body = encode_payload(payload)
+    encoded_at = time.perf_counter()
+
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'), len(body))
+    data = compress(body, encoding)
+    compressed_at = time.perf_counter()
+
+    response = Response(data, status=status, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+
+    with _stats_lock:
+        _stats["responses"] += 1
+        _stats["body_bytes"] += len(body)
+        _stats["sent_bytes"] += len(data)
+        _stats["encode_time"] += encoded_at - start_time
+        _stats["compress_time"] += compressed_at - encoded_at
+        _stats["encodings"][encoding] += 1
+    return response
+
+def stats():
+    with _stats_lock:
+        responses = _stats["responses"]
+        return {
+            "serializer": "orjson" if orjson is not None else "json",
+            "brotli": brotli is not None,
+            "responses": responses,
+            "body_bytes": _stats["body_bytes"],
+            "sent_bytes": _stats["sent_bytes"],
+            "compression_ratio": _stats["sent_bytes"] / _stats["body_bytes"] if _stats["body_bytes"] else 1.0,
+            "avg_encode_ms": _stats["encode_time"] / responses * 1000 if responses else 0.0,
+            "avg_compress_ms": _stats["compress_time"] / responses * 1000 if responses else 0.0,
+            "encodings": dict(_stats["encodings"])
+        }
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import registry
+from content_engine import ContentSimilarityEngine, CONTENT_NEIGHBORS_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit TF-IDF over product titles and persist top-K content neighbours")
+    parser.add_argument('--top-k', type=int, default=50)
+    parser.add_argument('--block-size', type=int, default=256)
+    parser.add_argument('--output', default=CONTENT_NEIGHBORS_PATH)
+    parser.add_argument('--ann', action='store_true',
+                        help="also build an IVF index over dense embeddings for approximate queries")
+    parser.add_argument('--no-exact', action='store_true',
+                        help="skip the exact neighbour lists and answer every query through the IVF index")
+    parser.add_argument('--dim', type=int, default=128)
+    parser.add_argument('--n-lists', type=int, default=256)
+    parser.add_argument('--n-probe', type=int, default=8)
+    args = parser.parse_args()
+
+    try:
+        start_time = time.time()
+        engine = registry.get_engine()
+
+        print("Fitting TF-IDF content engine...")
+        content_engine = ContentSimilarityEngine.from_engine(
+            engine,
+            exact=not args.no_exact,
+            top_k=args.top_k,
+            block_size=args.block_size
+        )
+
+        if args.ann or args.no_exact:
+            print("Building IVF index...")
+            content_engine.build_ann(dim=args.dim, n_lists=args.n_lists, n_probe=args.n_probe)
+
+        content_engine.save(args.output)
+        print(f"\nSaved neighbours for {len(content_engine.product_ids)} products to {args.output} "
+              f"in {time.time() - start_time:.1f}s")
+
+    except Exception as e:
+        print(f"\nAn error occurred: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,42 @@
-from sqlalchemy import create_engine, text
+import os
+import sys
+import argparse
+from sqlalchemy import text
 
-DB_CONFIG = {
-    'user': 'root',
-    'password': 'mysqlZ97*',
-    'host': 'localhost',
-    'database': 'dataset_db'
-}
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import registry
+from product_stats import create_product_stats_table
+from product_categories import create_product_categories_table
+from bulk_loader import create_ratings_table, create_ratings_indexes, create_ingest_state_table, INGEST_STATE_TABLE
 
 def create_connection():
     try:
-        engine = create_engine(f"mysql+mysqlconnector://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{DB_CONFIG['database']}")
-        return engine
+        return registry.get_engine()
     except Exception as e:
         print(f"Error creating database connection: {e}")
         raise
 
-def setup_database():
+def setup_database(reset=False):
+    """
+    Creates whichever tables are missing.  Existing data is kept unless
+    `reset` drops every table first (which also forgets the incremental
+    ingest state, so the next ingest is a full one).
+    """
     engine = create_connection()
     
     try:
         with engine.connect() as conn:
             with conn.begin():
-                conn.execute(text("DROP TABLE IF EXISTS amazon_beauty"))
-                conn.execute(text("DROP TABLE IF EXISTS product_images"))
-                conn.execute(text("DROP TABLE IF EXISTS products"))
+                if reset:
+                    print("Dropping existing tables...")
+                    conn.execute(text("DROP TABLE IF EXISTS product_stats"))
+                    conn.execute(text("DROP TABLE IF EXISTS product_categories"))
+                    conn.execute(text("DROP TABLE IF EXISTS amazon_beauty"))
+                    conn.execute(text("DROP TABLE IF EXISTS product_images"))
+                    conn.execute(text("DROP TABLE IF EXISTS products"))
+                    conn.execute(text(f"DROP TABLE IF EXISTS {INGEST_STATE_TABLE}"))
                 
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS amazon_beauty (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        ProductId VARCHAR(255),
-                        ProductType VARCHAR(255),
-                        Rating FLOAT,
-                        URL TEXT,
-                        Timestamp BIGINT,
-                        UserId VARCHAR(255),
-                        INDEX idx_product_id (ProductId(255)),
-                        INDEX idx_rating (Rating)
-                    )
-                """))
+                create_ratings_table(conn)
                 
                 conn.execute(text("""
                     CREATE TABLE IF NOT EXISTS products (
@@ -49,15 +48,22 @@ def setup_database():
                     )
                 """))
                 
+                create_product_stats_table(conn)
+                create_product_categories_table(conn)
+                create_ingest_state_table(conn)
+                
                 result = conn.execute(text("""
                     SELECT table_name 
                     FROM information_schema.tables 
                     WHERE table_schema = 'dataset_db'
                 """))
                 
-                print("\nCreated tables:")
+                print("\nTables:")
                 for row in result:
                     print(f"- {row[0]}")
+
+        # Missing indexes only; on a fresh amazon_beauty they cost nothing to create up front
+        create_ratings_indexes(engine)
                 
         print("\nDatabase setup completed successfully!")
         
@@ -66,4 +72,7 @@ def setup_database():
         raise
 
 if __name__ == "__main__":
-    setup_database() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create the database tables")
+    parser.add_argument('--reset', action='store_true',
+                        help="drop every table (and the ingest state) before creating them")
+    setup_database(parser.parse_args().reset) 
\ No newline at end of file
@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import text, bindparam
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import registry
+
+TOP_K = 10
+PARTITION_SIZE = 500
+
+NEIGHBORS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        ProductId VARCHAR(255) NOT NULL,
+        `rank` SMALLINT NOT NULL,
+        NeighborId VARCHAR(255) NOT NULL,
+        score FLOAT NOT NULL,
+        PRIMARY KEY (ProductId, `rank`)
+    )
+"""
+
+INSERT_NEIGHBOR = """
+    INSERT INTO {table} (ProductId, `rank`, NeighborId, score)
+    VALUES (:product_id, :rank, :neighbor_id, :score)
+"""
+
+recommender = None
+
+def create_connection():
+    return registry.get_engine()
+
+def prepare_staging_table(engine):
+    with engine.connect() as conn:
+        with conn.begin():
+            conn.execute(text(NEIGHBORS_TABLE_DDL.format(table="product_neighbors")))
+            conn.execute(text("DROP TABLE IF EXISTS product_neighbors_new"))
+            conn.execute(text(NEIGHBORS_TABLE_DDL.format(table="product_neighbors_new")))
+
+def swap_in_staging_table(engine):
+    with engine.connect() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS product_neighbors_old"))
+        conn.execute(text("""
+            RENAME TABLE product_neighbors TO product_neighbors_old,
+                         product_neighbors_new TO product_neighbors
+        """))
+        conn.execute(text("DROP TABLE product_neighbors_old"))
+
+def get_partitions(engine, partition_size=PARTITION_SIZE, product_ids=None):
+    """Groups all ProductIds (or only `product_ids`) by ProductType, splitting very large types into chunks"""
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT ProductType, ProductId
+            FROM products
+            WHERE ProductId IS NOT NULL
+            ORDER BY ProductType, ProductId
+        """)).fetchall()
+
+    if product_ids is not None:
+        wanted = set(product_ids)
+        rows = [row for row in rows if row.ProductId in wanted]
+
+    by_type = defaultdict(list)
+    for row in rows:
+        by_type[row.ProductType or ''].append(row.ProductId)
+
+    partitions = []
+    for product_type, product_ids in by_type.items():
+        for start in range(0, len(product_ids), partition_size):
+            partitions.append((product_type, product_ids[start:start + partition_size]))
+
+    # Largest partitions first so the pool does not wait on a straggler at the end
+    partitions.sort(key=lambda partition: len(partition[1]), reverse=True)
+    return partitions
+
+def init_worker():
+    global recommender
+    recommender = registry.get_recommender()
+
+def materialize_partition(product_type, product_ids, top_k, table="product_neighbors_new", replace=False):
+    """
+    Computes and inserts the neighbours of one partition.  With `replace`,
+    the partition's existing rows in `table` are swapped for the new ones in
+    one transaction (used to refresh only the products an ingest changed).
+    """
+    start_time = time.time()
+    rows = []
+    for product_id in product_ids:
+        recommendations = recommender.get_hybrid_recommendations(product_id, top_k)
+        for rank, rec in enumerate(recommendations, start=1):
+            rows.append({
+                "product_id": product_id,
+                "rank": rank,
+                "neighbor_id": rec['ProductId'],
+                "score": float(rec['similarity_score'])
+            })
+
+    if rows or replace:
+        with recommender.engine.connect() as conn:
+            with conn.begin():
+                if replace:
+                    conn.execute(
+                        text(f"DELETE FROM {table} WHERE ProductId IN :product_ids")
+                        .bindparams(bindparam("product_ids", expanding=True)),
+                        {"product_ids": list(product_ids)}
+                    )
+                if rows:
+                    conn.execute(text(INSERT_NEIGHBOR.format(table=table)), rows)
+
+    return product_type, len(product_ids), len(rows), time.time() - start_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute top-K hybrid neighbours for every product")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    parser.add_argument('--snapshot', action='store_true',
+                        help="load the catalog snapshot once and share it with the workers")
+    parser.add_argument('--products-file',
+                        help="only refresh these ProductIds (one per line, e.g. from "
+                             "preprocess_and_load.py --changed-products), in place")
+    args = parser.parse_args()
+
+    try:
+        start_time = time.time()
+        engine = create_connection()
+
+        if args.snapshot:
+            print("Loading catalog snapshot...")
+            registry.get_catalog_snapshot()
+        else:
+            registry.CATALOG_SNAPSHOT_ENABLED = False
+
+        product_ids = None
+        if args.products_file:
+            with open(args.products_file, encoding='utf-8') as f:
+                product_ids = [line.strip() for line in f if line.strip()]
+
+        partitions = get_partitions(engine, product_ids=product_ids)
+        total_products = sum(len(partition) for _, partition in partitions)
+        print(f"Materializing neighbours for {total_products} products "
+              f"in {len(partitions)} partitions on {args.workers} workers...")
+
+        if product_ids is None:
+            prepare_staging_table(engine)
+            table = "product_neighbors_new"
+        else:
+            with engine.connect() as conn:
+                with conn.begin():
+                    conn.execute(text(NEIGHBORS_TABLE_DDL.format(table="product_neighbors")))
+            table = "product_neighbors"
+
+        done_products = 0
+        total_rows = 0
+        # Forked workers share the snapshot arrays copy-on-write instead of reloading them
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=init_worker,
+            mp_context=multiprocessing.get_context('fork')
+        ) as pool:
+            futures = [
+                pool.submit(materialize_partition, product_type, partition, args.top_k,
+                            table, product_ids is not None)
+                for product_type, partition in partitions
+            ]
+            for future in as_completed(futures):
+                product_type, product_count, row_count, elapsed = future.result()
+                done_products += product_count
+                total_rows += row_count
+                print(f"- {product_type or '(no type)'}: {product_count} products, "
+                      f"{row_count} neighbours in {elapsed:.1f}s "
+                      f"[{done_products}/{total_products}]")
+
+        if product_ids is None:
+            swap_in_staging_table(engine)
+
+        elapsed = time.time() - start_time
+        print(f"\nWrote {total_rows} neighbours in {elapsed:.1f}s "
+              f"({total_products / elapsed:.1f} products/s)")
+
+    except Exception as e:
+        print(f"\nAn error occurred: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    main()
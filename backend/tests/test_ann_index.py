@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import sys
+import os
+import time
+import json
+import numpy as np
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ann_index import IVFIndex, brute_force_search, normalize_rows
+
+class AnnIndexTester:
+    def __init__(self, n_vectors=50000, dim=128, n_clusters=500, n_queries=500, k=10):
+        self.results = {}
+        self.k = k
+        rng = np.random.default_rng(42)
+        # Vektorë sintetikë të grupuar, të ngjashëm me embedding-et e produkteve
+        centers = rng.normal(size=(n_clusters, dim))
+        labels = rng.integers(0, n_clusters, size=n_vectors)
+        self.vectors = normalize_rows(centers[labels] + 1.5 * rng.normal(size=(n_vectors, dim)))
+        self.queries = rng.choice(n_vectors, size=n_queries, replace=False)
+
+    def test_recall_and_qps(self, n_lists=256, n_probes=(1, 2, 4, 8, 16, 32)):
+        """Testimi i recall@k dhe QPS kundrejt kërkimit të plotë (brute force)"""
+        print(f"Testimi i recall@{self.k} dhe QPS për indeksin IVF...")
+
+        results = {
+            'test_name': 'ANN Recall/QPS Test',
+            'timestamp': datetime.now().isoformat(),
+            'vectors': len(self.vectors),
+            'dim': int(self.vectors.shape[1]),
+            'n_lists': n_lists,
+            'tests': []
+        }
+
+        start_time = time.time()
+        exact = [
+            set(brute_force_search(self.vectors, self.vectors[q], self.k, exclude=q)[0].tolist())
+            for q in self.queries
+        ]
+        brute_time = time.time() - start_time
+        brute_qps = len(self.queries) / brute_time if brute_time > 0 else 0
+        print(f"   Brute force: {brute_qps:.0f} QPS")
+
+        start_time = time.time()
+        index = IVFIndex(n_lists=n_lists).fit(self.vectors)
+        results['build_time'] = time.time() - start_time
+
+        for n_probe in n_probes:
+            start_time = time.time()
+            found = [
+                index.search(index.vector(q), self.k, n_probe=n_probe, exclude=q)[0]
+                for q in self.queries
+            ]
+            elapsed = time.time() - start_time
+
+            recall = np.mean([
+                len(exact_ids.intersection(ids.tolist())) / self.k
+                for exact_ids, ids in zip(exact, found)
+            ])
+            qps = len(self.queries) / elapsed if elapsed > 0 else 0
+
+            results['tests'].append({
+                'n_probe': n_probe,
+                'recall': float(recall),
+                'qps': qps,
+                'speedup': qps / brute_qps if brute_qps > 0 else 0,
+                'success': bool(recall > 0)
+            })
+            print(f"     n_probe={n_probe}: recall@{self.k} = {recall:.3f}, {qps:.0f} QPS ({qps / brute_qps:.1f}x)")
+
+        results['summary'] = {
+            'total_tests': len(results['tests']),
+            'successful_tests': sum(1 for test in results['tests'] if test['success']),
+            'brute_force_qps': brute_qps,
+            'best_recall': max(test['recall'] for test in results['tests'])
+        }
+
+        self.results['recall_qps'] = results
+        return results
+
+    def test_mmap_load(self, n_lists=64):
+        """Kontrollon që indeksi i ngarkuar me mmap jep të njëjtat rezultate"""
+        print("Testimi i ruajtjes dhe ngarkimit me mmap...")
+
+        import tempfile
+        index = IVFIndex(n_lists=n_lists).fit(self.vectors)
+        with tempfile.TemporaryDirectory() as path:
+            index.save(path)
+            loaded = IVFIndex.load(path, mmap=True)
+
+            matches = 0
+            for q in self.queries:
+                original = index.search(index.vector(q), self.k, exclude=q)[0]
+                mapped = loaded.search(loaded.vector(q), self.k, exclude=q)[0]
+                matches += int(np.array_equal(original, mapped))
+            del loaded
+
+        results = {
+            'test_name': 'ANN mmap Load Test',
+            'timestamp': datetime.now().isoformat(),
+            'tests': [{'matching_queries': matches, 'success': matches == len(self.queries)}]
+        }
+        results['summary'] = {
+            'total_tests': 1,
+            'successful_tests': int(matches == len(self.queries))
+        }
+        print(f"   {matches}/{len(self.queries)} pyetje me rezultate identike")
+
+        self.results['mmap_load'] = results
+        return results
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË INDEKSIT ANN")
+        print("=" * 60)
+
+        self.test_recall_and_qps()
+        print()
+        self.test_mmap_load()
+        print()
+
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_ann_index_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = AnnIndexTester()
+    tester.run_all_tests()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+import sys
+import os
+import json
+import base64
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import create_engine, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import registry
+from app import app
+from catalog_snapshot import CatalogData
+from category_facets import SORTS
+from database_operations import _category_page_from_sql, get_category_products, decode_cursor
+from product_categories import categorize
+
+PRODUCT_TYPES = ['Eyeliner', 'Lipstick', 'Mascara', 'Foundation', 'Nail Polish', 'Face Cream', 'Perfume']
+
+class CategoryCursorTester:
+    def __init__(self, n_products=2000, per_page=37):
+        self.results = {}
+        self.per_page = per_page
+        rng = np.random.default_rng(11)
+        product_ids = [f"B{i:09d}" for i in rng.permutation(n_products)]
+
+        # Pak vlera të ndryshme për çdo kolonë renditjeje, që faqet të ndahen brenda barazimeve
+        self.products = pd.DataFrame({
+            'ProductId': product_ids,
+            'ProductType': rng.choice(PRODUCT_TYPES, size=n_products),
+            'ProductTitle': [f"Product {i}" for i in range(n_products)],
+            'ImageURL': [f"http://localhost:5001/static/images/{i}.jpg" for i in range(n_products)],
+            'URL': [f"https://www.amazon.com/dp/{product_id}" for product_id in product_ids],
+            'price': rng.choice([0.0, 9.99, 19.99, 29.99], size=n_products)
+        })
+        self.stats = pd.DataFrame({
+            'ProductId': product_ids,
+            'avg_rating': rng.choice([3.5, 4.0, 4.5, 5.0], size=n_products),
+            'rating_count': rng.choice([0, 1, 2, 3], size=n_products)
+        })
+
+        self.directory = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.directory, 'catalog.db')}")
+        with self.engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text(
+                    "CREATE TABLE products (ProductId VARCHAR(255) PRIMARY KEY, ProductType VARCHAR(255), "
+                    "ProductTitle TEXT, ImageURL TEXT, URL TEXT, price FLOAT)"
+                ))
+                conn.execute(text(
+                    "CREATE TABLE product_stats (ProductId VARCHAR(255) PRIMARY KEY, avg_rating FLOAT, "
+                    "rating_count INT)"
+                ))
+                # DDL-ja e product_categories ka INDEX brenda tabelës, që SQLite nuk e pranon
+                conn.execute(text(
+                    "CREATE TABLE product_categories (category VARCHAR(32) NOT NULL, ProductId VARCHAR(255) NOT NULL, "
+                    "PRIMARY KEY (category, ProductId))"
+                ))
+                conn.execute(text(
+                    "INSERT INTO products VALUES (:ProductId, :ProductType, :ProductTitle, :ImageURL, :URL, :price)"
+                ), self.products.to_dict('records'))
+                conn.execute(text(
+                    "INSERT INTO product_stats VALUES (:ProductId, :avg_rating, :rating_count)"
+                ), self.stats.astype(object).to_dict('records'))
+                conn.execute(text("INSERT INTO product_categories VALUES (:category, :product_id)"), [
+                    {"category": category, "product_id": product_id}
+                    for product_id, product_type in zip(product_ids, self.products['ProductType'])
+                    for category in categorize(product_type)
+                ])
+
+        # Pa snapshot, faqet lexohen nga SQL
+        registry._pid = os.getpid()
+        registry._engine = self.engine
+        registry.CATALOG_SNAPSHOT_ENABLED = False
+        self.client = app.test_client()
+
+        frame = self.products.merge(self.stats, on='ProductId')
+        self.frame = frame[(frame['price'] > 0) & (frame['rating_count'] > 0)]
+
+    def _expected(self, category, sort, product_types=None):
+        """Rezultati i pritur me pandas: filtrim dhe renditje e plotë"""
+        frame = self.frame[self.frame['ProductType'].map(lambda t: category in categorize(t))]
+        if product_types:
+            frame = frame[frame['ProductType'].isin(product_types)]
+        (primary, primary_desc), (secondary, secondary_desc) = SORTS[sort]
+        frame = frame.sort_values(
+            [primary, secondary, 'ProductId'],
+            ascending=[not primary_desc, not secondary_desc, True],
+            kind='stable'
+        )
+        return frame['ProductId'].tolist()
+
+    def _follow(self, category, sort, filters):
+        """Të gjitha faqet e një kategorie duke ndjekur next_cursor nga SQL"""
+        seen, after, pages, cursors = [], None, 0, []
+        while True:
+            products, total, next_cursor, _ = _category_page_from_sql(
+                self.engine, category, sort, 0, self.per_page, after, filters
+            )
+            seen += [product['ProductId'] for product in products]
+            pages += 1
+            if next_cursor is None:
+                return seen, total, pages, cursors
+            cursors.append(next_cursor)
+            after = decode_cursor(next_cursor)
+
+    def _check(self, name, success, detail=""):
+        print(f"   {'✅' if success else '❌'} {name}" + (f": {detail}" if detail else ""))
+        self.results['steps'].append({'name': name, 'success': bool(success), 'detail': detail})
+
+    def test_cursor_pages(self):
+        """next_cursor nëpër të gjitha faqet, me barazime në renditje"""
+        print("Testimi i faqeve me cursor nga SQL...")
+        cases = [
+            ('makeup', 'rating', {}),
+            ('makeup', 'popularity', {}),
+            ('makeup', 'price_asc', {}),
+            ('skincare', 'price_desc', {}),
+            ('makeup', 'rating', {'product_types': ['Lipstick', 'Mascara']})
+        ]
+        for category, sort, filters in cases:
+            expected = self._expected(category, sort, filters.get('product_types'))
+            seen, total, pages, _ = self._follow(category, sort, filters)
+            self._check(
+                f"{category}/{sort} {filters}",
+                seen == expected and total == len(expected),
+                f"{len(seen)} produkte në {pages} faqe"
+            )
+
+    def test_page_fallback(self):
+        """?page= pa cursor jep të njëjtat faqe si cursor-i"""
+        print("Testimi i faqeve me offset...")
+        expected = self._expected('makeup', 'popularity')
+        pages = []
+        for page in range(1, 4):
+            result = get_category_products(self.engine, 'makeup', page=page, per_page=self.per_page,
+                                           sort='popularity')
+            pages.append([product['ProductId'] for product in result['products']])
+        self._check("faqet 1-3 me offset", sum(pages, []) == expected[:3 * self.per_page])
+
+        # Cursor-i i faqes së dytë vazhdon aty ku mbaron faqja e dytë me offset
+        _, _, _, cursors = self._follow('makeup', 'popularity', {})
+        result = get_category_products(self.engine, 'makeup', per_page=self.per_page,
+                                       after=decode_cursor(cursors[1]), sort='popularity')
+        self._check("cursor-i pas faqes së dytë", [product['ProductId'] for product in result['products']] == pages[2])
+
+        response = self.client.get(f"/api/makeup?per_page={self.per_page}&page=2&sort=popularity")
+        body = response.get_json()
+        self._check(
+            "endpoint-i me ?page=",
+            response.status_code == 200 and [product['ProductId'] for product in body['products']] == pages[1]
+            and body['total'] == len(expected),
+            f"status {response.status_code}"
+        )
+
+    def test_snapshot_accepts_sql_cursor(self):
+        """Snapshot-i vazhdon nga cursor-i i SQL me të njëjtat rreshta"""
+        print("Testimi i cursor-it ndërmjet SQL dhe snapshot...")
+        aggregates = self.stats.assign(review_count=self.stats['rating_count'], liked_avg=4.5, liked_users=0)
+        liked = pd.DataFrame({'UserId': ['U0'], 'ProductId': self.products['ProductId'][:1], 'Rating': [5.0]})
+        data = CatalogData(self.products, aggregates, liked)
+        _, _, _, cursors = self._follow('makeup', 'rating', {})
+        for cursor in cursors[:3]:
+            indexes, _, _, _ = data.facets.query('makeup', 'rating', limit=self.per_page, after=decode_cursor(cursor))
+            products, _, _, _ = _category_page_from_sql(
+                self.engine, 'makeup', 'rating', 0, self.per_page, decode_cursor(cursor), {}
+            )
+            if [data.product_ids[i] for i in indexes] != [product['ProductId'] for product in products]:
+                self._check("snapshot-i dhe SQL pas të njëjtit cursor", False, cursor)
+                return
+        self._check("snapshot-i dhe SQL pas të njëjtit cursor", True, f"{len(cursors[:3])} cursor-ë")
+
+    def test_malformed_cursors(self):
+        """Cursor-ët e dëmtuar kthejnë 400, jo 500"""
+        print("Testimi i cursor-ëve të pavlefshëm...")
+
+        def encode(raw):
+            return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+        cursors = {
+            'jo base64': '%%%',
+            'jo JSON': encode('not json'),
+            'dy fusha': encode('[4.5,3]'),
+            'vlerë jo numerike': encode('["x",3,"B000000001"]'),
+            'objekt': encode('{"a":1}')
+        }
+        for name, cursor in cursors.items():
+            response = self.client.get('/api/makeup', query_string={'cursor': cursor})
+            self._check(f"cursor {name}", response.status_code == 400, f"status {response.status_code}")
+
+        for query in ('page=0', 'per_page=0', 'per_page=1000', 'sort=random', 'min_price=abc'):
+            response = self.client.get(f"/api/makeup?{query}")
+            self._check(query, response.status_code == 400, f"status {response.status_code}")
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË CURSOR-IT TË KATEGORIVE")
+        print("=" * 60)
+
+        self.results['steps'] = []
+        try:
+            self.test_cursor_pages()
+            print()
+            self.test_page_fallback()
+            print()
+            self.test_snapshot_accepts_sql_cursor()
+            print()
+            self.test_malformed_cursors()
+            print()
+        finally:
+            self.engine.dispose()
+            shutil.rmtree(self.directory)
+
+        self.results['test_name'] = 'Category Cursor Test'
+        self.results['timestamp'] = datetime.now().isoformat()
+        self.results['summary'] = {
+            'total_tests': len(self.results['steps']),
+            'successful_tests': sum(1 for step in self.results['steps'] if step['success'])
+        }
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_category_cursor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = CategoryCursorTester()
+    tester.run_all_tests()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+import sys
+import os
+import time
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog_snapshot import CatalogData
+from category_facets import SORTS
+from product_categories import categorize
+
+PRODUCT_TYPES = [
+    'Eyeliner', 'Lipstick', 'Lipstick Matte', 'Foundation', 'Mascara', 'Face Cream',
+    'Skin Serum', 'Hair Shampoo', 'Hair Conditioner', 'Perfume', 'Body Spray',
+    'Makeup Brush', 'Beauty Tool Kit', 'Nail Polish', 'Face Mask'
+]
+
+class CategoryFacetsTester:
+    def __init__(self, n_products=100000, n_queries=500):
+        self.results = {}
+        self.n_queries = n_queries
+        rng = np.random.default_rng(42)
+        product_ids = [f"B{i:09d}" for i in range(n_products)]
+
+        # Katalog sintetik me çmime, vlerësime dhe numër vlerësimesh realiste
+        products = pd.DataFrame({
+            'ProductId': product_ids,
+            'ProductType': rng.choice(PRODUCT_TYPES, size=n_products),
+            'ProductTitle': [f"Product {i}" for i in range(n_products)],
+            'ImageURL': [f"http://localhost:5001/static/images/{i}.jpg" for i in range(n_products)],
+            'URL': [f"https://www.amazon.com/dp/{product_id}" for product_id in product_ids],
+            'price': np.round(rng.uniform(0, 120, size=n_products), 2)
+        })
+        rating_count = rng.zipf(1.8, size=n_products).clip(max=5000)
+        aggregates = pd.DataFrame({
+            'ProductId': product_ids,
+            'avg_rating': np.round(rng.uniform(1, 5, size=n_products), 2),
+            'review_count': rating_count,
+            'rating_count': rating_count,
+            'liked_avg': 4.5,
+            'liked_users': 0
+        })
+        liked = pd.DataFrame({'UserId': ['U0', 'U0'], 'ProductId': product_ids[:2], 'Rating': [5.0, 5.0]})
+
+        start_time = time.time()
+        self.data = CatalogData(products, aggregates, liked)
+        self.build_time = time.time() - start_time
+
+        frame = products.merge(aggregates, on='ProductId')
+        self.frame = frame[(frame['price'] > 0) & (frame['rating_count'] > 0)]
+
+    def _expected(self, category, sort, min_price=None, max_price=None, min_rating=None, product_types=None):
+        """Rezultati i pritur me pandas: filtrim dhe renditje e plotë"""
+        frame = self.frame[self.frame['ProductType'].map(lambda t: category in categorize(t))]
+        if min_price is not None:
+            frame = frame[frame['price'] >= min_price]
+        if max_price is not None:
+            frame = frame[frame['price'] <= max_price]
+        if min_rating is not None:
+            frame = frame[frame['avg_rating'] >= min_rating]
+        if product_types:
+            frame = frame[frame['ProductType'].isin(product_types)]
+        (primary, primary_desc), (secondary, secondary_desc) = SORTS[sort]
+        frame = frame.sort_values(
+            [primary, secondary, 'ProductId'],
+            ascending=[not primary_desc, not secondary_desc, True],
+            kind='stable'
+        )
+        return frame['ProductId'].tolist()
+
+    def test_correctness(self):
+        """Faqet e filtruara dhe të renditura kundrejt pandas"""
+        print("Testimi i saktësisë së faceteve...")
+        tests = []
+        cases = [
+            ('makeup', 'rating', {}),
+            ('makeup', 'price_asc', {'min_price': 10, 'max_price': 40}),
+            ('skincare', 'popularity', {'min_rating': 4.0}),
+            ('makeup', 'price_desc', {'product_types': ['Lipstick', 'Mascara'], 'min_rating': 3.0}),
+            ('haircare', 'rating', {'max_price': 25})
+        ]
+        for category, sort, filters in cases:
+            expected = self._expected(category, sort, **filters)
+            indexes, total, _, _ = self.data.facets.query(category, sort, limit=50, **filters)
+            first_page = [self.data.product_ids[i] for i in indexes]
+
+            # Faqja e dytë me cursor nga rreshti i fundit i faqes së parë
+            last = indexes[-1]
+            (primary, _), (secondary, _) = SORTS[sort]
+            keys = {'avg_rating': self.data.avg_rating[last], 'rating_count': float(self.data.rating_count[last]),
+                    'price': self.data.price[last]}
+            after = (keys[primary], keys[secondary], self.data.product_ids[last])
+            indexes, _, _, _ = self.data.facets.query(category, sort, limit=50, after=after, **filters)
+            second_page = [self.data.product_ids[i] for i in indexes]
+
+            test_result = {
+                'category': category,
+                'sort': sort,
+                'filters': filters,
+                'total': total,
+                'success': total == len(expected) and first_page + second_page == expected[:100]
+            }
+            tests.append(test_result)
+            status = "✅" if test_result['success'] else "❌"
+            print(f"   {status} {category}/{sort} {filters}: {total} produkte")
+
+        results = {
+            'test_name': 'Category Facets Correctness Test',
+            'timestamp': datetime.now().isoformat(),
+            'tests': tests,
+            'summary': {
+                'total_tests': len(tests),
+                'successful_tests': sum(1 for test in tests if test['success'])
+            }
+        }
+        self.results['correctness'] = results
+        return results
+
+    def test_latency(self):
+        """Koha e përgjigjes për faqe të filtruara e të renditura"""
+        print("Testimi i kohës së përgjigjes...")
+        rng = np.random.default_rng(7)
+        times = []
+        for _ in range(self.n_queries):
+            category = rng.choice(['makeup', 'skincare', 'haircare', 'fragrance', 'miscellaneous'])
+            low = float(rng.uniform(0, 60))
+            start_time = time.perf_counter()
+            self.data.facets.query(
+                category,
+                rng.choice(list(SORTS)),
+                min_price=low,
+                max_price=low + float(rng.uniform(10, 60)),
+                min_rating=float(rng.choice([0, 3, 4])),
+                offset=int(rng.integers(0, 10)) * 20,
+                limit=20
+            )
+            times.append((time.perf_counter() - start_time) * 1000)
+
+        times = np.array(times)
+        results = {
+            'test_name': 'Category Facets Latency Test',
+            'timestamp': datetime.now().isoformat(),
+            'products': len(self.data.product_ids),
+            'build_time': self.build_time,
+            'index_bytes': self.data.facets.memory_bytes,
+            'avg_ms': float(times.mean()),
+            'p50_ms': float(np.percentile(times, 50)),
+            'p99_ms': float(np.percentile(times, 99))
+        }
+        print(f"   {results['products']} produkte, ndërtimi {self.build_time:.2f}s, "
+              f"indekset {results['index_bytes'] / 1024 / 1024:.1f}MB")
+        print(f"   Mesatarja: {results['avg_ms']:.3f}ms, p50: {results['p50_ms']:.3f}ms, p99: {results['p99_ms']:.3f}ms")
+        self.results['latency'] = results
+        return results
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË FACETEVE TË KATEGORIVE")
+        print("=" * 60)
+
+        self.test_correctness()
+        print()
+        self.test_latency()
+        print()
+
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_category_facets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = CategoryFacetsTester()
+    tester.run_all_tests()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import sys
+import os
+import time
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compact_frames import frame_from_rows, compact, memory_report, format_memory_report
+from collaborative_engine import ItemCooccurrenceEngine
+from catalog_snapshot import CatalogData
+
+class CompactFramesTester:
+    def __init__(self, n_ratings=1000000, n_users=200000, n_products=20000):
+        self.results = {}
+        rng = np.random.default_rng(17)
+        # Rreshta si ato që kthen fetchall(): objekte Python për çdo fushë
+        users = rng.integers(0, n_users, size=n_ratings)
+        products = (rng.zipf(1.3, size=n_ratings) - 1) % n_products
+        ratings = rng.choice([4.0, 5.0], size=n_ratings, p=[0.4, 0.6])
+        self.rows = [
+            (f"A{u:013d}", f"B{p:09d}", float(r))
+            for u, p, r in zip(users.tolist(), products.tolist(), ratings.tolist())
+        ]
+        self.columns = ['UserId', 'ProductId', 'Rating']
+        self.catalog_ids = [f"B{p:09d}" for p in range(0, n_products, 2)]
+
+    def test_memory(self):
+        """Memoria e vlerësimeve: objekte Python kundrejt tipeve kompakte"""
+        print("Testimi i memories...")
+        start_time = time.time()
+        plain = pd.DataFrame(self.rows, columns=self.columns)
+        plain_time = time.time() - start_time
+        start_time = time.time()
+        compacted = frame_from_rows(self.rows, self.columns)
+        compact_time = time.time() - start_time
+
+        before, after = memory_report(plain), memory_report(compacted)
+        same_values = (
+            compacted['UserId'].astype(str).equals(plain['UserId'])
+            and compacted['ProductId'].astype(str).equals(plain['ProductId'])
+            and np.array_equal(compacted['Rating'].to_numpy(dtype=np.float64), plain['Rating'].to_numpy())
+        )
+        results = {
+            'test_name': 'Compact Frames Memory Test',
+            'timestamp': datetime.now().isoformat(),
+            'before': before,
+            'after': after,
+            'reduction': before['bytes'] / after['bytes'],
+            'build_seconds': {'plain': plain_time, 'compact': compact_time},
+            'success': same_values and after['bytes'] < before['bytes']
+        }
+        print(f"   {format_memory_report('Vlerësimet', before, after)}, {results['reduction']:.1f}x më pak")
+        print(f"   Tipet: {after['dtypes']}")
+        print(f"   {'✅' if same_values else '❌'} të njëjtat vlera")
+        self.results['memory'] = results
+        return results
+
+    def test_models(self):
+        """Modelet e ndërtuara nga të dy format japin të njëjtin rezultat"""
+        print("Testimi i modeleve...")
+        plain = pd.DataFrame(self.rows, columns=self.columns)
+        compacted = compact(plain)
+
+        start_time = time.time()
+        plain_engine = ItemCooccurrenceEngine.from_frame(plain, self.catalog_ids)
+        plain_time = time.time() - start_time
+        start_time = time.time()
+        compact_engine = ItemCooccurrenceEngine.from_frame(compacted, self.catalog_ids)
+        compact_time = time.time() - start_time
+
+        same_engine = (
+            list(plain_engine.product_ids) == list(compact_engine.product_ids)
+            and (plain_engine.user_counts != compact_engine.user_counts).nnz == 0
+            and np.allclose(plain_engine.avg_ratings.data, compact_engine.avg_ratings.data)
+        )
+
+        products = pd.DataFrame({
+            'ProductId': self.catalog_ids,
+            'ProductType': 'Lipstick',
+            'ProductTitle': 'Lipstick',
+            'ImageURL': None,
+            'URL': None,
+            'price': 10.0
+        })
+        aggregates = pd.DataFrame({
+            'ProductId': self.catalog_ids, 'avg_rating': 4.5, 'review_count': 1,
+            'rating_count': 1, 'liked_avg': 4.5, 'liked_users': 1
+        })
+        plain_data = CatalogData(products, aggregates, plain)
+        compact_data = CatalogData(products, aggregates, compacted)
+        same_neighbors = all(
+            all(np.array_equal(a, b) for a, b in zip(
+                plain_data.cooccurrence.neighbors(product_id, 10),
+                compact_data.cooccurrence.neighbors(product_id, 10)
+            ))
+            for product_id in self.catalog_ids[:500]
+        )
+
+        results = {
+            'test_name': 'Compact Frames Model Test',
+            'timestamp': datetime.now().isoformat(),
+            'build_seconds': {'plain': plain_time, 'compact': compact_time},
+            'same_cooccurrence': same_engine,
+            'same_snapshot_neighbors': same_neighbors,
+            'success': same_engine and same_neighbors
+        }
+        print(f"   {'✅' if same_engine else '❌'} i njëjti model bashkë-vlerësimesh "
+              f"({plain_time:.2f}s -> {compact_time:.2f}s)")
+        print(f"   {'✅' if same_neighbors else '❌'} të njëjtët fqinjë në snapshot")
+        self.results['models'] = results
+        return results
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË TIPEVE KOMPAKTE")
+        print("=" * 60)
+
+        self.test_memory()
+        print()
+        self.test_models()
+        print()
+
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_compact_frames_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = CompactFramesTester()
+    tester.run_all_tests()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import create_engine, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.preprocess_and_load import ingest, ingest_incremental, watermark_checksum
+from test_streaming_ingest import write_dataset
+
+COLUMNS = ['UserId', 'ProductId', 'Rating', 'Timestamp', 'URL', 'ProductType']
+
+def new_ratings(n_rows, seed):
+    """Vlerësime të reja, më të vona se çdo rresht i skedarit fillestar"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'UserId': [f"N{u:012d}" for u in rng.integers(0, n_rows, size=n_rows)],
+        'ProductId': [f"B{p:09d}" for p in rng.integers(0, 2000, size=n_rows)],
+        'Rating': rng.integers(1, 6, size=n_rows).astype(float),
+        'Timestamp': rng.integers(1_700_000_001, 1_750_000_000, size=n_rows),
+        'URL': [f"https://www.amazon.com/dp/B{p:09d} " for p in rng.integers(0, 1000, size=n_rows)],
+        'ProductType': rng.choice(['Eyeliner', 'Lipstick'], size=n_rows)
+    })[COLUMNS]
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return sorted(tuple(row) for row in conn.execute(text(
+            "SELECT UserId, ProductId, Rating, Timestamp, URL, ProductType FROM amazon_beauty"
+        )))
+
+def _full_reload(csv_path, db_path, chunk_size):
+    engine = create_engine(f"sqlite:///{db_path}")
+    report = ingest(engine, csv_path, chunk_size)
+    rows = _rows(engine)
+    engine.dispose()
+    return report, rows
+
+class IncrementalIngestTester:
+    def __init__(self, n_rows=300000, n_new=3000, chunk_size=50000):
+        self.results = {}
+        self.n_rows = n_rows
+        self.n_new = n_new
+        self.chunk_size = chunk_size
+
+    def _check(self, name, success, detail=""):
+        print(f"   {'✅' if success else '❌'} {name}" + (f": {detail}" if detail else ""))
+        self.results['steps'].append({'name': name, 'success': bool(success), 'detail': detail})
+
+    def test_incremental_ingest(self, directory):
+        """Ngarkimi i vetëm rreshtave të rinj, i përsëritshëm pa dyfishime"""
+        print("Testimi i ngarkimit inkremental...")
+        self.results['steps'] = []
+        csv_path = os.path.join(directory, 'ratings.csv')
+        write_dataset(csv_path, self.n_rows)
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'incremental.db')}")
+
+        first = ingest_incremental(engine, csv_path, self.chunk_size)
+        self._check("ngarkimi i parë është i plotë", first['mode'] == 'full', f"{first['rows_loaded']} rreshta")
+
+        # Rreshta të rinj, disa të përsëritur dhe një rresht i fundit ende pa përfunduar
+        added = new_ratings(self.n_new, seed=21)
+        appended = pd.concat([added, added.sample(n=self.n_new // 10, random_state=3)])
+        appended.to_csv(csv_path, mode='a', header=False, index=False)
+        with open(csv_path, 'a', encoding='utf-8') as f:
+            f.write("N000000000001,B000000001,5.0,17")
+
+        start_time = time.time()
+        delta = ingest_incremental(engine, csv_path, self.chunk_size)
+        delta_time = time.time() - start_time
+        expected = added.drop_duplicates()
+        self._check(
+            "vetëm rreshtat e shtuar",
+            delta['mode'] == 'append' and delta['rows_loaded'] == len(expected)
+            and delta['rows_read'] == len(appended),
+            f"{delta['rows_loaded']} të rinj nga {delta['rows_read']} të lexuar në {delta_time:.2f}s"
+        )
+        self._check(
+            "produktet e ndryshuar",
+            delta['changed_products'] == sorted(expected['ProductId'].unique()),
+            f"{len(delta['changed_products'])} produkte"
+        )
+
+        again = ingest_incremental(engine, csv_path, self.chunk_size)
+        self._check("përsëritja nuk shton asgjë", again['rows_loaded'] == 0 and not again['changed_products'])
+
+        # Një ekzekutim që ngarkoi rreshtat por nuk arriti të ruajë gjendjen
+        with engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text("UPDATE ingest_state SET file_offset = :offset, checksum = :checksum"), {
+                    "offset": delta['start_offset'],
+                    "checksum": watermark_checksum(csv_path, delta['start_offset'])
+                })
+        retried = ingest_incremental(engine, csv_path, self.chunk_size)
+        self._check(
+            "rileximi pas dështimit është idempotent",
+            retried['mode'] == 'append' and retried['rows_loaded'] == 0
+            and retried['already_loaded_rows'] == len(expected),
+            f"{retried['already_loaded_rows']} rreshta të ngarkuar më parë"
+        )
+
+        # Skedar i ndryshuar para kufirit: lexohet i gjithë nga kufiri i Timestamp
+        with engine.connect() as conn:
+            with conn.begin():
+                conn.execute(text("UPDATE ingest_state SET checksum = 'x'"))
+        rescanned = ingest_incremental(engine, csv_path, self.chunk_size)
+        self._check(
+            "kontrolli i dështuar kalon në kufirin e Timestamp",
+            rescanned['mode'] == 'rescan' and rescanned['rows_loaded'] == 0,
+            f"{rescanned['older_rows']} rreshta para kufirit"
+        )
+
+        # Rreshti i fundit përfundon
+        with open(csv_path, 'a', encoding='utf-8') as f:
+            f.write("00000001,https://www.amazon.com/dp/B000000001,Lipstick\n")
+        finished = ingest_incremental(engine, csv_path, self.chunk_size)
+        self._check("rreshti i papërfunduar ngarkohet kur mbaron",
+                    finished['rows_loaded'] == 1 and finished['changed_products'] == ['B000000001'])
+
+        # Skedari rishkruhet me rend tjetër dhe me rreshta të rinj
+        rewritten = pd.read_csv(csv_path, dtype=str).sample(frac=1, random_state=9)
+        later = new_ratings(500, seed=22)
+        later['Timestamp'] += 100_000_000
+        pd.concat([rewritten, later.astype(str)]).to_csv(csv_path, index=False)
+        rescan = ingest_incremental(engine, csv_path, self.chunk_size)
+        self._check(
+            "skedari i rishkruar lexohet nga kufiri i Timestamp",
+            rescan['mode'] == 'rescan' and rescan['rows_loaded'] == len(later.drop_duplicates()),
+            f"{rescan['rows_loaded']} të rinj"
+        )
+
+        incremental_rows = _rows(engine)
+        engine.dispose()
+        reload_report, reload_rows = _full_reload(csv_path, os.path.join(directory, 'full.db'), self.chunk_size)
+        self._check("e njëjta tabelë si ringarkimi i plotë", incremental_rows == reload_rows,
+                    f"{len(incremental_rows)} rreshta")
+
+        self.results['timing'] = {
+            'delta_rows': len(appended),
+            'delta_seconds': delta_time,
+            'full_reload_rows': reload_report['rows_read'],
+            'full_reload_seconds': reload_report['seconds'],
+            'speedup': reload_report['seconds'] / delta_time
+        }
+        print(f"   Delta: {delta_time:.2f}s, ringarkim i plotë: {reload_report['seconds']:.2f}s "
+              f"({self.results['timing']['speedup']:.0f}x)")
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË NGARKIMIT INKREMENTAL")
+        print("=" * 60)
+
+        directory = tempfile.mkdtemp()
+        try:
+            self.test_incremental_ingest(directory)
+            print()
+        finally:
+            shutil.rmtree(directory)
+
+        self.results['test_name'] = 'Incremental Ingest Test'
+        self.results['timestamp'] = datetime.now().isoformat()
+        self.results['summary'] = {
+            'total_tests': len(self.results['steps']),
+            'successful_tests': sum(1 for step in self.results['steps'] if step['success'])
+        }
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_incremental_ingest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = IncrementalIngestTester()
+    tester.run_all_tests()
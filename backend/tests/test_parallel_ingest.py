@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime
+from sqlalchemy import create_engine, inspect, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scripts.preprocess_and_load as preprocess_and_load
+from scripts.preprocess_and_load import ingest, ingest_parallel, split_byte_ranges
+from bulk_loader import RATINGS_INDEXES, RATINGS_UNIQUE_INDEXES
+from test_streaming_ingest import write_dataset
+
+def _table_rows(engine):
+    # Në rendin e ngarkimit, që të krahasohet edhe cili dyfish u mbajt
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT UserId, ProductId, Rating, Timestamp, URL, ProductType FROM amazon_beauty ORDER BY id"
+        )).fetchall()
+
+_load_range = preprocess_and_load.load_range
+
+def failing_load_range(url, table, spooled, keep, first_id, worker):
+    # Një worker që dështon në mes të ngarkimit
+    if worker == 1:
+        raise RuntimeError("worker failed")
+    return _load_range(url, table, spooled, keep, first_id, worker)
+
+def _leftover_tables(engine):
+    with engine.connect() as conn:
+        return [
+            name for name in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars()
+            if name != 'amazon_beauty' and not name.startswith('sqlite_')
+        ]
+
+class ParallelIngestTester:
+    def __init__(self, n_rows=600000, worker_counts=(2, 4), chunk_size=50000):
+        self.results = {}
+        self.n_rows = n_rows
+        self.worker_counts = worker_counts
+        self.chunk_size = chunk_size
+
+    def test_byte_ranges(self, csv_path):
+        """Çdo rresht i skedarit bie në saktësisht një interval"""
+        print("Testimi i ndarjes në intervale bajtesh...")
+        with open(csv_path, 'rb') as f:
+            f.readline()
+            lines = f.read().splitlines()
+
+        tests = []
+        for parts in (1, 3, 7, 64):
+            _, ranges = split_byte_ranges(csv_path, parts)
+            with open(csv_path, 'rb') as f:
+                pieces = []
+                for start, end in ranges:
+                    f.seek(start)
+                    pieces.append(f.read(end - start))
+            aligned = all(piece.endswith(b'\n') for piece in pieces)
+            tests.append({
+                'parts': parts,
+                'ranges': len(ranges),
+                'success': aligned and b''.join(pieces).splitlines() == lines
+            })
+            print(f"   {'✅' if tests[-1]['success'] else '❌'} {parts} pjesë -> {len(ranges)} intervale")
+        self.results['byte_ranges'] = {
+            'test_name': 'Byte Range Split Test',
+            'timestamp': datetime.now().isoformat(),
+            'tests': tests
+        }
+
+    def test_parallel_ingest(self, csv_path, directory):
+        """Ngarkimi paralel kundrejt atij me një proces"""
+        print("Testimi i ngarkimit paralel...")
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'single.db')}")
+        single = ingest(engine, csv_path, self.chunk_size)
+        expected = _table_rows(engine)
+        engine.dispose()
+        print(f"   Një proces: {single['rows_per_second']:.0f} rreshta/s ({single['seconds']:.1f}s)")
+
+        runs = []
+        for workers in self.worker_counts:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, f'parallel_{workers}.db')}")
+            # Një tabelë ekzistuese që zëvendësohet vetëm në fund
+            ingest(engine, csv_path, self.chunk_size * 10)
+            report = ingest_parallel(engine, csv_path, workers, self.chunk_size)
+            leftovers = _leftover_tables(engine)
+            run = {
+                'workers': workers,
+                'seconds': report['seconds'],
+                'parse_seconds': report['parse_seconds'],
+                'load_seconds': report['load_seconds'],
+                'index_seconds': report['index_seconds'],
+                'rows_per_second': report['rows_per_second'],
+                'speedup': single['seconds'] / report['seconds'],
+                'per_worker_rows_per_second': [worker['rows_per_second'] for worker in report['workers']],
+                'success': _table_rows(engine) == expected and report['rows_loaded'] == single['rows_loaded']
+                           and not leftovers
+            }
+            engine.dispose()
+            runs.append(run)
+            print(f"   {'✅' if run['success'] else '❌'} {workers} workers: {run['rows_per_second']:.0f} rreshta/s, "
+                  f"përshpejtimi {run['speedup']:.2f}x")
+            print(f"      Për worker: {', '.join(f'{rate:.0f}' for rate in run['per_worker_rows_per_second'])} rreshta/s")
+
+        # Ngarkime të përsëritura mbi të njëjtën databazë: indekset e tabelës së zëvendësuar nuk përplasen
+        engine = create_engine(f"sqlite:///{os.path.join(directory, f'parallel_{self.worker_counts[0]}.db')}")
+        try:
+            for _ in range(2):
+                ingest_parallel(engine, csv_path, self.worker_counts[0], self.chunk_size)
+            repeated_error = None
+        except Exception as e:
+            repeated_error = str(e)
+        indexes = inspect(engine).get_indexes('amazon_beauty')
+        repeated = {
+            'error': repeated_error,
+            'indexes': sorted(index['name'] for index in indexes),
+            'success': repeated_error is None and _table_rows(engine) == expected and not _leftover_tables(engine)
+                       and len(indexes) == len(RATINGS_INDEXES) + len(RATINGS_UNIQUE_INDEXES)
+        }
+        engine.dispose()
+        print(f"   {'✅' if repeated['success'] else '❌'} tre ngarkime paralele në të njëjtën databazë"
+              + (f": {repeated_error}" if repeated_error else ""))
+
+        # Një worker i dështuar: tabela e vjetër mbetet e paprekur dhe asgjë nuk mbetet pas
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'failed.db')}")
+        ingest(engine, csv_path, self.chunk_size * 10)
+        preprocess_and_load.load_range = failing_load_range
+        try:
+            ingest_parallel(engine, csv_path, 2, self.chunk_size)
+            raised = False
+        except RuntimeError:
+            raised = True
+        finally:
+            preprocess_and_load.load_range = _load_range
+        cleanup = {
+            'raised': raised,
+            'leftovers': _leftover_tables(engine),
+            'success': raised and not _leftover_tables(engine) and _table_rows(engine) == expected
+        }
+        engine.dispose()
+        print(f"   {'✅' if cleanup['success'] else '❌'} worker i dështuar: "
+              f"tabelat e përkohshme u fshinë, amazon_beauty e paprekur")
+
+        self.results['parallel_ingest'] = {
+            'test_name': 'Parallel Ingest Test',
+            'timestamp': datetime.now().isoformat(),
+            'rows': self.n_rows,
+            'cpu_count': os.cpu_count(),
+            'single_process_seconds': single['seconds'],
+            'runs': runs,
+            'repeated_runs': repeated,
+            'failed_worker': cleanup,
+            'summary': {
+                'total_tests': len(runs) + 2,
+                'successful_tests': sum(1 for run in runs if run['success']) + int(repeated['success'])
+                                    + int(cleanup['success'])
+            }
+        }
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË NGARKIMIT PARALEL")
+        print("=" * 60)
+
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'ratings.csv')
+            write_dataset(csv_path, self.n_rows)
+
+            self.test_byte_ranges(csv_path)
+            print()
+            self.test_parallel_ingest(csv_path, directory)
+            print()
+
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_parallel_ingest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = ParallelIngestTester()
+    tester.run_all_tests()
@@ -237,6 +237,47 @@ class PerformanceTester:
         self.results['throughput'] = results
         return results
     
+    def test_batch_throughput(self):
+        """Testimi i throughput-it me API-në batch (një thirrje për të gjitha produktet)"""
+        print("Testimi i throughput-it batch...")
+
+        results = {
+            'test_name': 'Batch Throughput Test',
+            'timestamp': datetime.now().isoformat(),
+            'tests': []
+        }
+
+        start_time = time.time()
+        batch = self.recommender.get_hybrid_recommendations_batch(self.test_products, 4)
+        end_time = time.time()
+
+        total_recommendations = 0
+        for product_id in self.test_products:
+            recommendations = batch.get(product_id, [])
+            total_recommendations += len(recommendations)
+            results['tests'].append({
+                'product_id': product_id,
+                'recommendations_count': len(recommendations),
+                'success': len(recommendations) > 0
+            })
+            print(f"     ✅ {product_id}: {len(recommendations)} rekomandime")
+
+        total_time = end_time - start_time
+        throughput = total_recommendations / total_time if total_time > 0 else 0
+
+        results['summary'] = {
+            'total_tests': len(results['tests']),
+            'successful_tests': sum(1 for test in results['tests'] if test['success']),
+            'total_recommendations': total_recommendations,
+            'total_time': total_time,
+            'throughput': throughput
+        }
+
+        print(f"   Throughput batch: {throughput:.2f} rekomandime/sekondë")
+
+        self.results['batch_throughput'] = results
+        return results
+
     def run_all_tests(self):
         """Ekzekuton të gjitha testet"""
         print("🚀 FILLIMI I TESTEVE TË PERFORMANCËS")
@@ -248,6 +289,8 @@ class PerformanceTester:
         print()
         self.test_throughput()
         print()
+        self.test_batch_throughput()
+        print()
         
         self.create_final_report()
     
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+import sys
+import os
+import time
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import create_engine
+from flask import Flask, jsonify
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import registry
+import responses
+from catalog_snapshot import CatalogData, CatalogSnapshot
+from database_operations import get_category_products
+
+PRODUCT_TYPES = [
+    'Eyeliner', 'Lipstick', 'Foundation', 'Mascara', 'Face Cream', 'Skin Serum',
+    'Hair Shampoo', 'Hair Conditioner', 'Perfume', 'Body Spray', 'Makeup Brush', 'Nail Polish'
+]
+
+ACCEPT_ENCODINGS = {
+    'identity': '',
+    'gzip': 'gzip, deflate',
+    'br': 'br, gzip, deflate'
+}
+
+class ResponseLayerTester:
+    def __init__(self, n_products=20000, iterations=200):
+        self.results = {}
+        self.iterations = iterations
+        self.app = Flask(__name__)
+        rng = np.random.default_rng(3)
+        product_ids = [f"B{i:09d}" for i in range(n_products)]
+
+        # Katalog sintetik, i ngarkuar si snapshot pa databazë
+        products = pd.DataFrame({
+            'ProductId': product_ids,
+            'ProductType': rng.choice(PRODUCT_TYPES, size=n_products),
+            'ProductTitle': [f"Beauty product {i} with a realistically long marketplace title" for i in range(n_products)],
+            'ImageURL': [f"https://m.media-amazon.com/images/I/{i:010d}.jpg" for i in range(n_products)],
+            'URL': [f"https://www.amazon.com/dp/{product_id}" for product_id in product_ids],
+            'price': np.round(rng.uniform(1, 120, size=n_products), 2)
+        })
+        rating_count = rng.zipf(1.8, size=n_products).clip(max=5000)
+        aggregates = pd.DataFrame({
+            'ProductId': product_ids,
+            'avg_rating': np.round(rng.uniform(1, 5, size=n_products), 2),
+            'review_count': rating_count,
+            'rating_count': rating_count,
+            'liked_avg': 4.5,
+            'liked_users': 0
+        })
+        liked = pd.DataFrame({'UserId': ['U0', 'U0'], 'ProductId': product_ids[:2], 'Rating': [5.0, 5.0]})
+        self.data = CatalogData(products, aggregates, liked)
+
+        snapshot = CatalogSnapshot(create_engine('sqlite://'))
+        snapshot.data = self.data
+        registry._pid = os.getpid()
+        registry._catalog_snapshot = snapshot
+
+        # Rekomandime me formën e atyre që kthen motori hibrid
+        def recommendation(i):
+            record = self.data.product_record(i)
+            record.update({"Rating": float(self.data.avg_rating[i]), "ReviewCount": int(self.data.rating_count[i]),
+                           "similarity_score": 0.8, "source": "content"})
+            return record
+        self.single = {"success": True, "recommendations": [recommendation(i) for i in range(4)]}
+        self.batch = {
+            "success": True,
+            "recommendations": {
+                product_ids[i]: [recommendation((i * 7 + j) % n_products) for j in range(4)]
+                for i in range(100)
+            }
+        }
+
+    def _measure(self, build, encode, accept):
+        """CPU për kërkesë dhe bajtet e dërguara, për një mënyrë serializimi"""
+        with self.app.test_request_context(headers={'Accept-Encoding': accept}):
+            response = encode(build())
+            sent = len(response.get_data())
+            start_time = time.process_time()
+            for _ in range(self.iterations):
+                encode(build()).get_data()
+            cpu_ms = (time.process_time() - start_time) / self.iterations * 1000
+        return {'bytes': sent, 'cpu_ms': cpu_ms, 'encoding': response.headers.get('Content-Encoding', 'identity')}
+
+    def _compare(self, name, build_plain, build_encoded):
+        print(f"   {name}:")
+        baseline = self._measure(build_plain, jsonify, '')
+        rows = {'jsonify': baseline}
+        print(f"     jsonify          {baseline['bytes']:>8} B  {baseline['cpu_ms']:.3f}ms")
+        for label, accept in ACCEPT_ENCODINGS.items():
+            measured = self._measure(build_encoded, responses.json_response, accept)
+            rows[label] = measured
+            print(f"     {label:<8} -> {measured['encoding']:<8}{measured['bytes']:>8} B  {measured['cpu_ms']:.3f}ms")
+
+        with self.app.test_request_context():
+            plain = json.loads(jsonify(build_plain()).get_data())
+            fast = json.loads(responses.json_response(build_encoded()).get_data())
+        rows['same_payload'] = plain == fast
+        print(f"     {'✅' if rows['same_payload'] else '❌'} i njëjti JSON si jsonify")
+        return rows
+
+    def test_category_endpoint(self):
+        """Faqet e kategorive: jsonify kundrejt shtresës së re"""
+        print("Testimi i përgjigjeve të kategorive...")
+        results = {'test_name': 'Category Response Test', 'timestamp': datetime.now().isoformat(), 'pages': {}}
+        for per_page in (20, 100):
+            results['pages'][per_page] = self._compare(
+                f"makeup, {per_page} produkte",
+                lambda: get_category_products(None, 'makeup', 1, per_page),
+                lambda: get_category_products(None, 'makeup', 1, per_page, encoded=True)
+            )
+        self.results['category'] = results
+        return results
+
+    def test_recommendation_endpoint(self):
+        """Rekomandimet e vetme dhe në grup: jsonify kundrejt shtresës së re"""
+        print("Testimi i përgjigjeve të rekomandimeve...")
+        results = {
+            'test_name': 'Recommendation Response Test',
+            'timestamp': datetime.now().isoformat(),
+            'single': self._compare("një produkt", lambda: self.single, lambda: self.single),
+            'batch': self._compare("grup me 100 produkte", lambda: self.batch, lambda: self.batch)
+        }
+        self.results['recommendations'] = results
+        return results
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË SHTRESËS SË PËRGJIGJEVE")
+        print(f"   Serializuesi: {responses.stats()['serializer']}, brotli: {responses.brotli is not None}")
+        print("=" * 60)
+
+        self.test_category_endpoint()
+        print()
+        self.test_recommendation_endpoint()
+        print()
+
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_response_layer_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = ResponseLayerTester()
+    tester.run_all_tests()
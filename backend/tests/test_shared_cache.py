@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+import sys
+import os
+import time
+import json
+import tempfile
+import threading
+import socketserver
+import multiprocessing
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache import BoundedCache, RedisBackend, SQLiteBackend, invalidate_shared_product, set_shared_backend
+
+class _RedisStandInHandler(socketserver.StreamRequestHandler):
+    """Implements the handful of Redis commands the cache uses, over real RESP"""
+
+    def _reply(self, value):
+        if value is None:
+            self.wfile.write(b'$-1\r\n')
+        elif isinstance(value, int):
+            self.wfile.write(b':%d\r\n' % value)
+        elif isinstance(value, list):
+            self.wfile.write(b'*%d\r\n' % len(value))
+            for item in value:
+                self.wfile.write(b'$%d\r\n%s\r\n' % (len(item), item))
+        elif value == 'OK':
+            self.wfile.write(b'+OK\r\n')
+        else:
+            self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            with self.server.lock:
+                now = time.time()
+                for key in [k for k, (_, expires_at) in store.items() if expires_at and expires_at <= now]:
+                    del store[key]
+
+                if self.server.refuse_writes and command in (b'SET', b'SADD', b'PEXPIRE'):
+                    # Si një Redis që ka arritur maxmemory
+                    self.wfile.write(b"-OOM command not allowed when used memory > 'maxmemory'.\r\n")
+                elif command == b'GET':
+                    entry = store.get(args[1])
+                    self._reply(entry[0] if entry and isinstance(entry[0], bytes) else None)
+                elif command == b'SET':
+                    expires_at = now + int(args[4]) / 1000 if len(args) > 4 and args[3].upper() == b'PX' else None
+                    store[args[1]] = (args[2], expires_at)
+                    self._reply('OK')
+                elif command == b'DEL':
+                    self._reply(sum(1 for key in args[1:] if store.pop(key, None) is not None))
+                elif command == b'SADD':
+                    members = store.setdefault(args[1], (set(), None))[0]
+                    added = len(set(args[2:]) - members)
+                    members.update(args[2:])
+                    self._reply(added)
+                elif command == b'SMEMBERS':
+                    entry = store.get(args[1])
+                    self._reply(sorted(entry[0]) if entry else [])
+                elif command == b'PEXPIRE':
+                    entry = store.get(args[1])
+                    if entry:
+                        store[args[1]] = (entry[0], now + int(args[2]) / 1000)
+                    self._reply(1 if entry else 0)
+                elif command in (b'SELECT', b'PING'):
+                    self._reply('OK')
+                else:
+                    self.wfile.write(b'-ERR unknown command\r\n')
+
+class RedisStandIn(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _RedisStandInHandler)
+        self.store = {}
+        self.lock = threading.Lock()
+        self.refuse_writes = False
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+def _worker_read(path, key, queue):
+    cache = BoundedCache("details", ttl=60, backend=SQLiteBackend(path))
+    queue.put(cache.get(key))
+
+class SharedCacheTester:
+    def __init__(self, entries=2000):
+        self.results = {}
+        self.entries = entries
+        self.product = {
+            "ProductId": "B0009V1YR8",
+            "ProductType": "Eyeliner",
+            "Rating": 4.5,
+            "ReviewCount": 120,
+            "price": 12.99,
+            "currency": "EUR"
+        }
+
+    def _check_backend(self, name, make_backend):
+        """Dy workers me L1 të veçantë mbi të njëjtin backend"""
+        tests = []
+
+        writer = BoundedCache(f"{name}_details", ttl=60, l1_ttl=5, backend=make_backend())
+        reader = BoundedCache(f"{name}_details", ttl=60, l1_ttl=5, backend=make_backend())
+
+        writer.set("B0009V1YR8", self.product, tags=["B0009V1YR8"])
+        tests.append({
+            'check': 'warm across workers',
+            'success': reader.get("B0009V1YR8") == self.product
+        })
+
+        removed = writer.invalidate_tag("B0009V1YR8")
+        reader.delete("B0009V1YR8")
+        tests.append({
+            'check': 'tag invalidation reaches backend',
+            'success': removed >= 1 and BoundedCache(f"{name}_details", backend=make_backend()).get("B0009V1YR8") is None
+        })
+
+        short = BoundedCache(f"{name}_short", ttl=0.2, backend=make_backend())
+        short.set("expiring", self.product)
+        time.sleep(0.3)
+        tests.append({
+            'check': 'backend TTL',
+            'success': BoundedCache(f"{name}_short", backend=make_backend()).get("expiring") is None
+        })
+
+        start_time = time.time()
+        for i in range(self.entries):
+            writer.set(f"P{i}", dict(self.product, ProductId=f"P{i}"))
+        write_time = time.time() - start_time
+
+        cold = BoundedCache(f"{name}_details", ttl=60, backend=make_backend())
+        start_time = time.time()
+        found = sum(1 for i in range(self.entries) if cold.get(f"P{i}") is not None)
+        l2_time = time.time() - start_time
+
+        start_time = time.time()
+        for i in range(self.entries):
+            cold.get(f"P{i}")
+        l1_time = time.time() - start_time
+
+        tests.append({
+            'check': 'cold worker reads',
+            'success': found == self.entries,
+            'writes_per_second': self.entries / write_time if write_time > 0 else 0,
+            'l2_reads_per_second': self.entries / l2_time if l2_time > 0 else 0,
+            'l1_reads_per_second': self.entries / l1_time if l1_time > 0 else 0
+        })
+
+        for test in tests:
+            status = "✅" if test['success'] else "❌"
+            print(f"     {status} {test['check']}")
+        print(f"   Shkrime: {tests[-1]['writes_per_second']:.0f}/s, "
+              f"lexime L2: {tests[-1]['l2_reads_per_second']:.0f}/s, "
+              f"lexime L1: {tests[-1]['l1_reads_per_second']:.0f}/s")
+        return tests
+
+    def _check_error_replies(self, server):
+        """Një përgjigje gabimi nga Redis trajtohet si miss, jo si përjashtim"""
+        backend = RedisBackend('127.0.0.1', server.port)
+        cache = BoundedCache("redis_refused", ttl=60, backend=backend)
+        server.refuse_writes = True
+        try:
+            cache.set("B0009V1YR8", self.product, tags=["B0009V1YR8"])
+            refused = BoundedCache("redis_refused", backend=backend).get("B0009V1YR8") is None
+            success = refused
+        except Exception as e:
+            print(f"     {str(e)}")
+            success = False
+        finally:
+            server.refuse_writes = False
+
+        # E njëjta lidhje vazhdon të punojë pasi Redis pranon sërish shkrimet
+        cache.set("B0009V1YR8", self.product)
+        success = success and BoundedCache("redis_refused", backend=backend).get("B0009V1YR8") == self.product
+        print(f"     {'✅' if success else '❌'} error replies")
+        return {'check': 'error replies', 'success': success}
+
+    def test_redis_backend(self):
+        """Testimi i backend-it Redis kundrejt një serveri lokal zëvendësues"""
+        print("Testimi i backend-it Redis...")
+        server = RedisStandIn()
+        try:
+            tests = self._check_backend('redis', lambda: RedisBackend('127.0.0.1', server.port))
+            tests.append(self._check_error_replies(server))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        results = {
+            'test_name': 'Redis Backend Test',
+            'timestamp': datetime.now().isoformat(),
+            'tests': tests
+        }
+        results['summary'] = {
+            'total_tests': len(tests),
+            'successful_tests': sum(1 for test in tests if test['success'])
+        }
+        self.results['redis_backend'] = results
+        return results
+
+    def test_sqlite_backend(self):
+        """Testimi i backend-it SQLite, edhe nga një proces tjetër"""
+        print("Testimi i backend-it SQLite...")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.db')
+            tests = self._check_backend('sqlite', lambda: SQLiteBackend(path))
+
+            BoundedCache("details", ttl=60, backend=SQLiteBackend(path)).set("B0043OYFKU", self.product)
+            queue = multiprocessing.Queue()
+            worker = multiprocessing.Process(target=_worker_read, args=(path, "B0043OYFKU", queue))
+            worker.start()
+            worker.join(timeout=30)
+            tests.append({
+                'check': 'separate process reads',
+                'success': not queue.empty() and queue.get() == self.product
+            })
+            print(f"     {'✅' if tests[-1]['success'] else '❌'} separate process reads")
+
+            # Skripti i ngarkimit inkremental fshin produktet e ndryshuar pa pasur cache-t e workers
+            set_shared_backend(SQLiteBackend(path))
+            try:
+                BoundedCache("product_details", ttl=60, shared=True).set(
+                    "B0043OYFKU", self.product, tags=["B0043OYFKU"]
+                )
+                removed = invalidate_shared_product("B0043OYFKU")
+                cold = BoundedCache("product_details", ttl=60, shared=True)
+                tests.append({
+                    'check': 'script invalidation',
+                    'success': removed == 1 and cold.get("B0043OYFKU") is None
+                })
+            finally:
+                set_shared_backend(None)
+            print(f"     {'✅' if tests[-1]['success'] else '❌'} script invalidation")
+
+        results = {
+            'test_name': 'SQLite Backend Test',
+            'timestamp': datetime.now().isoformat(),
+            'tests': tests
+        }
+        results['summary'] = {
+            'total_tests': len(tests),
+            'successful_tests': sum(1 for test in tests if test['success'])
+        }
+        self.results['sqlite_backend'] = results
+        return results
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË CACHE-IT TË PËRBASHKËT")
+        print("=" * 60)
+
+        self.test_redis_backend()
+        print()
+        self.test_sqlite_backend()
+        print()
+
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_shared_cache_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = SharedCacheTester()
+    tester.run_all_tests()
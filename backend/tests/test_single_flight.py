@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import sys
+import os
+import time
+import json
+import threading
+from datetime import datetime
+from sqlalchemy import event
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cache
+import registry
+from database_operations import get_product_details
+from recommendation_model import get_recommendations_with_images
+
+class SingleFlightTester:
+    def __init__(self, concurrency=32):
+        self.engine = registry.get_engine()
+        self.concurrency = concurrency
+        self.results = {}
+        self.test_products = ['B0009V1YR8', 'B0043OYFKU', 'B0000YUXI0']
+        self.query_count = 0
+        self._count_lock = threading.Lock()
+        event.listen(self.engine, "before_cursor_execute", self._count_query)
+
+    def _count_query(self, conn, cursor, statement, parameters, context, executemany):
+        with self._count_lock:
+            self.query_count += 1
+
+    def _cold_queries(self, func, product_id):
+        """Numri i query-ve për një thirrje të vetme pa cache"""
+        cache.clear_all()
+        self.query_count = 0
+        func(product_id)
+        return self.query_count
+
+    def _parallel_queries(self, func, product_id):
+        """Numri i query-ve kur N kërkesa identike vijnë njëkohësisht pa cache"""
+        cache.clear_all()
+        self.query_count = 0
+        barrier = threading.Barrier(self.concurrency)
+        results = [None] * self.concurrency
+
+        def request(i):
+            barrier.wait()
+            results[i] = func(product_id)
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(self.concurrency)]
+        start_time = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start_time
+        return self.query_count, results, elapsed
+
+    def _check(self, name, func):
+        tests = []
+        for product_id in self.test_products:
+            func(product_id)  # Ngroh motorët e ngarkuar në mënyrë lazy
+            single = self._cold_queries(func, product_id)
+            parallel, results, elapsed = self._parallel_queries(func, product_id)
+            identical = all(result == results[0] for result in results)
+
+            test_result = {
+                'product_id': product_id,
+                'concurrency': self.concurrency,
+                'single_request_queries': single,
+                'parallel_queries': parallel,
+                'identical_results': identical,
+                'response_time': elapsed,
+                'success': parallel == single and identical
+            }
+            tests.append(test_result)
+
+            status = "✅" if test_result['success'] else "❌"
+            print(f"   {status} {product_id}: {self.concurrency} kërkesa -> {parallel} query "
+                  f"(1 kërkesë: {single}), {elapsed * 1000:.1f}ms")
+
+        results = {
+            'test_name': name,
+            'timestamp': datetime.now().isoformat(),
+            'tests': tests,
+            'summary': {
+                'total_tests': len(tests),
+                'successful_tests': sum(1 for test in tests if test['success'])
+            }
+        }
+        return results
+
+    def test_product_details(self):
+        """Detajet e produktit: një query për N kërkesa paralele"""
+        print("Testimi i single-flight për detajet e produktit...")
+        results = self._check(
+            'Product Details Single-Flight Test',
+            lambda product_id: get_product_details(self.engine, product_id)
+        )
+        for test in results['tests']:
+            test['success'] = test['success'] and test['parallel_queries'] <= 1
+        self.results['product_details'] = results
+        return results
+
+    def test_recommendations(self):
+        """Rekomandimet me imazhe: query-të e një kërkese të vetme për N kërkesa paralele"""
+        print("Testimi i single-flight për rekomandimet...")
+        results = self._check('Recommendations Single-Flight Test', get_recommendations_with_images)
+        self.results['recommendations'] = results
+        return results
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË SINGLE-FLIGHT")
+        print("=" * 60)
+
+        self.test_product_details()
+        print()
+        self.test_recommendations()
+        print()
+
+        self.results['flight_stats'] = cache.all_flight_stats()
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_single_flight_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = SingleFlightTester()
+    tester.run_all_tests()
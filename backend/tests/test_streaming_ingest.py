@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+import sys
+import os
+import time
+import json
+import sqlite3
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import create_engine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.preprocess_and_load import ingest, peak_rss_mb
+
+def write_dataset(path, n_rows, seed=11):
+    """CSV me formën e amazon_beauty, me rreshta të dyfishtë dhe fusha bosh"""
+    rng = np.random.default_rng(seed)
+    unique = n_rows * 9 // 10
+    frame = pd.DataFrame({
+        'UserId': [f"A{u:012d}" for u in rng.integers(0, unique // 5, size=unique)],
+        'ProductId': [f"B{p:09d}" for p in rng.integers(0, unique // 20, size=unique)],
+        'Rating': rng.integers(1, 6, size=unique).astype(float),
+        'Timestamp': rng.integers(1_300_000_000, 1_700_000_000, size=unique),
+        'URL': [f"https://www.amazon.com/dp/B{p:09d} " for p in rng.integers(0, 1000, size=unique)],
+        'ProductType': rng.choice(['Eyeliner', 'Lipstick', 'Face Cream', 'Hair Shampoo'], size=unique)
+    })
+    # Dyfishet bien në chunk-e të ndryshme nga origjinalet
+    frame = pd.concat([frame, frame.sample(n=n_rows - unique, random_state=seed)], ignore_index=True)
+    frame = frame.sample(frac=1, random_state=seed + 1).reset_index(drop=True)
+    frame.loc[frame.sample(frac=0.01, random_state=seed + 2).index, 'ProductType'] = None
+    frame.to_csv(path, index=False)
+
+def _run_streaming(csv_path, db_path, chunk_size, queue):
+    report = ingest(create_engine(f"sqlite:///{db_path}"), csv_path, chunk_size)
+    queue.put(report)
+
+def _run_whole_file(csv_path, db_path, queue):
+    # Rruga e vjetër: gjithë skedari në memorie, pastrim dhe ngarkim në një hap
+    start_time = time.time()
+    df = pd.concat(list(pd.read_csv(csv_path, chunksize=100000, dtype=str)))
+    df = df.dropna().drop_duplicates()
+    df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
+    df['Timestamp'] = pd.to_numeric(df['Timestamp'], errors='coerce')
+    df['URL'] = df['URL'].astype(str).str.strip()
+    df.to_sql('amazon_beauty', sqlite3.connect(db_path), if_exists='replace', index=False, chunksize=10000)
+    queue.put({"rows_loaded": len(df), "seconds": time.time() - start_time, "peak_rss_mb": peak_rss_mb()})
+
+def _in_process(target, *args):
+    """Çdo matje në një proces të ri, që RSS maksimale të mos trashëgohet"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=target, args=args + (queue,))
+    process.start()
+    result = queue.get(timeout=600)
+    process.join()
+    return result
+
+def _table_rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return set(conn.execute(
+            "SELECT UserId, ProductId, Rating, Timestamp, URL, ProductType FROM amazon_beauty"
+        ).fetchall())
+
+class StreamingIngestTester:
+    def __init__(self, sizes=(200000, 800000), chunk_size=50000):
+        self.results = {}
+        self.sizes = sizes
+        self.chunk_size = chunk_size
+
+    def test_ingest(self):
+        """Ngarkimi me chunk-e kundrejt ngarkimit të gjithë skedarit"""
+        print("Testimi i ngarkimit me chunk-e...")
+        tests = []
+        with tempfile.TemporaryDirectory() as directory:
+            for n_rows in self.sizes:
+                csv_path = os.path.join(directory, f"ratings_{n_rows}.csv")
+                write_dataset(csv_path, n_rows)
+                streaming_db = os.path.join(directory, f"streaming_{n_rows}.db")
+                whole_db = os.path.join(directory, f"whole_{n_rows}.db")
+
+                streaming = _in_process(_run_streaming, csv_path, streaming_db, self.chunk_size)
+                whole = _in_process(_run_whole_file, csv_path, whole_db)
+
+                test_result = {
+                    'rows': n_rows,
+                    'rows_loaded': streaming['rows_loaded'],
+                    'duplicate_rows': streaming['duplicate_rows'],
+                    'incomplete_rows': streaming['incomplete_rows'],
+                    'rows_per_second': streaming['rows_per_second'],
+                    'streaming_peak_rss_mb': streaming['peak_rss_mb'],
+                    'whole_file_peak_rss_mb': whole['peak_rss_mb'],
+                    'whole_file_rows_per_second': n_rows / whole['seconds'],
+                    'success': streaming['rows_loaded'] == whole['rows_loaded']
+                               and _table_rows(streaming_db) == _table_rows(whole_db)
+                }
+                tests.append(test_result)
+                status = "✅" if test_result['success'] else "❌"
+                print(f"   {status} {n_rows} rreshta: {streaming['rows_loaded']} të ngarkuar, "
+                      f"{streaming['duplicate_rows']} dyfishë, {streaming['incomplete_rows']} jo të plotë")
+                print(f"      Me chunk-e: {streaming['rows_per_second']:.0f} rreshta/s, "
+                      f"RSS maksimale {streaming['peak_rss_mb']:.0f}MB")
+                print(f"      Gjithë skedari: {test_result['whole_file_rows_per_second']:.0f} rreshta/s, "
+                      f"RSS maksimale {whole['peak_rss_mb']:.0f}MB")
+
+        results = {
+            'test_name': 'Streaming Ingest Test',
+            'timestamp': datetime.now().isoformat(),
+            'chunk_size': self.chunk_size,
+            'tests': tests,
+            'summary': {
+                'total_tests': len(tests),
+                'successful_tests': sum(1 for test in tests if test['success'])
+            }
+        }
+        self.results['ingest'] = results
+        return results
+
+    def run_all_tests(self):
+        """Ekzekuton të gjitha testet"""
+        print("🚀 FILLIMI I TESTEVE TË NGARKIMIT ME CHUNK-E")
+        print("=" * 60)
+
+        self.test_ingest()
+        print()
+
+        self.save_results_to_file()
+
+    def save_results_to_file(self):
+        """Ruan rezultatet në skedar JSON"""
+        filename = f"test_results_streaming_ingest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+        print(f"\n💾 Rezultatet u ruajtën në: {filename}")
+
+if __name__ == "__main__":
+    tester = StreamingIngestTester()
+    tester.run_all_tests()
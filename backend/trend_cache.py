@@ -0,0 +1,144 @@
+import threading
+import time
+from cache import BoundedCache
+
+class TrendCache:
+    """
+    Trending results cached once per ProductType.
+
+    `compute(product_type, limit)` returns the ranked trending products of a
+    type.  Each entry keeps the top `depth` products, enough to answer any
+    request for fewer items after dropping the anchor product itself.
+
+    With the background refresher running, entries are recomputed shortly
+    before they expire, so requests only pay for a computation the first time
+    a type is seen.  Should an entry expire anyway (a slow or failed refresh,
+    or a worker without the refresher), it is served stale for up to `grace`
+    seconds, one TTL by default, while it is recomputed in the background.
+    """
+
+    def __init__(self, compute, ttl=300, depth=20, check_interval=None, max_bytes=16 * 1024 * 1024, grace=None):
+        self.compute = compute
+        self.ttl = ttl
+        self.depth = depth
+        self.check_interval = check_interval or max(ttl / 10, 1)
+        # Refresh early enough that a slow cycle still lands before expiry
+        self.refresh_margin = 2 * self.check_interval
+        self.grace = ttl if grace is None else grace
+        self.entries = BoundedCache(
+            "trends", max_bytes=max_bytes, ttl=ttl, jitter=0.1, shared=True, grace=self.grace
+        )
+        self._metrics_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.miss_time = 0.0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.refresh_time = 0.0
+        self.last_refresh_ms = None
+
+    def get(self, product_type, num_recommendations=4, exclude=None):
+        if num_recommendations + 1 > self.depth:
+            # Deeper than what is cached; compute directly without caching
+            ranked = self.compute(product_type, num_recommendations + 1)
+        else:
+            ranked, stale = self.entries.lookup(product_type)
+            if ranked is not None:
+                if stale:
+                    self.entries.refresh(
+                        product_type,
+                        lambda: self.compute(product_type, self.depth),
+                        tags=lambda ranked: self._tags(product_type, ranked)
+                    )
+                with self._metrics_lock:
+                    self.hits += 1
+            else:
+                start_time = time.perf_counter()
+                ranked = self._compute(product_type)
+                with self._metrics_lock:
+                    self.misses += 1
+                    self.miss_time += time.perf_counter() - start_time
+
+        return [
+            rec for rec in ranked if rec['ProductId'] != exclude
+        ][:num_recommendations]
+
+    def _compute(self, product_type):
+        ranked = self.compute(product_type, self.depth)
+        self.entries.set(product_type, ranked, tags=self._tags(product_type, ranked))
+        return ranked
+
+    @staticmethod
+    def _tags(product_type, ranked):
+        # Tagged with every listed ProductId so product invalidation reaches the ranking
+        return [product_type] + [rec['ProductId'] for rec in ranked]
+
+    def refresh_expiring(self):
+        """Recomputes every entry that would expire before the next check"""
+        expiring = self.entries.expiring(self.refresh_margin)
+        for product_type in expiring:
+            start_time = time.perf_counter()
+            try:
+                self._compute(product_type)
+            except Exception as e:
+                with self._metrics_lock:
+                    self.refresh_errors += 1
+                print(f"Error refreshing trends for {product_type}: {str(e)}")
+                continue
+            elapsed = time.perf_counter() - start_time
+            with self._metrics_lock:
+                self.refreshes += 1
+                self.refresh_time += elapsed
+                self.last_refresh_ms = elapsed * 1000
+        return len(expiring)
+
+    def invalidate(self, product_type=None):
+        if product_type is None:
+            self.entries.clear()
+        else:
+            self.entries.delete(product_type)
+
+    def start_background_refresh(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop,
+            name="trend-cache-refresh",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.refresh_expiring()
+            except Exception as e:
+                print(f"Error in trend cache refresh: {str(e)}")
+
+    def stats(self):
+        with self._metrics_lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.entries.current_bytes,
+                "evictions": self.entries.evictions,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "stale_hits": self.entries.stale_hits,
+                "avg_miss_ms": self.miss_time / self.misses * 1000 if self.misses else 0.0,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "avg_refresh_ms": self.refresh_time / self.refreshes * 1000 if self.refreshes else 0.0,
+                "last_refresh_ms": self.last_refresh_ms,
+                "background_refresh": self._thread is not None and self._thread.is_alive()
+            }
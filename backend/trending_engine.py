@@ -0,0 +1,328 @@
+import math
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+DEFAULT_HALF_LIFE_DAYS = 30
+# exp(600) is still far from float64 overflow; past that the counters are rebased
+MAX_EXPONENT = 600.0
+
+CATALOG_QUERY = text("""
+    SELECT ProductId, ProductType
+    FROM products
+    WHERE ProductId IS NOT NULL
+""")
+
+CATALOG_SIZE_QUERY = text("SELECT COUNT(*) FROM products WHERE ProductId IS NOT NULL")
+
+# Liked ratings in an id range, so each refresh only reads the rows added since the previous one
+TREND_EVENTS_QUERY = text("""
+    SELECT ab.ProductId, ab.UserId, ab.Rating, ab.Timestamp
+    FROM amazon_beauty ab
+    WHERE ab.id > :after_id
+        AND ab.id <= :until_id
+        AND ab.Rating >= 4.0
+        AND ab.Timestamp IS NOT NULL
+        AND ab.ProductId IS NOT NULL
+""")
+
+TABLE_STATE_QUERY = text("SELECT MAX(id), COUNT(*) FROM amazon_beauty")
+
+ROWS_UP_TO_QUERY = text("SELECT COUNT(*) FROM amazon_beauty WHERE id <= :last_id")
+
+# Everything a rebuild replaces; the lock, thread and engine stay
+_STATE_ATTRIBUTES = (
+    'landmark', 'latest_timestamp', 'product_ids', 'index', 'type_codes', 'types', 'type_index', 'members',
+    'decayed', 'liked_sum', 'liked_count', 'liked_users', 'liked_pairs', 'last_id', 'rows_seen'
+)
+
+class DecayedTrendingEngine:
+    """
+    Exponentially time-decayed popularity per product, ranked within each ProductType.
+
+    Every liked rating (Rating >= 4) adds `Rating * exp(-lambda * age)` to its
+    product, with lambda set from `half_life_days`.  Counters use forward decay:
+    they are stored relative to a fixed landmark time, so a new rating only
+    touches its own product and the ranking inside a type never has to be
+    re-decayed.  Scores are reported as of the newest rating seen.
+
+    Per-type top-K lists are kept in memory and recomputed lazily, only for
+    types that received new ratings since the last query.  As in the
+    all-time ranking, a product needs `min_ratings` distinct users who liked
+    it; (product, user) pairs are kept as sorted 64-bit hashes for that.
+
+    With an engine, a background thread catches up with `amazon_beauty`
+    every `refresh_interval` seconds (see `refresh`).
+    """
+
+    def __init__(self, half_life_days=DEFAULT_HALF_LIFE_DAYS, min_ratings=10, top_k=50,
+                 engine=None, refresh_interval=600):
+        self.half_life_days = half_life_days
+        self.decay_rate = math.log(2) / (half_life_days * 86400)
+        self.min_ratings = min_ratings
+        self.top_k = top_k
+        self.landmark = None
+        self.latest_timestamp = None
+        self.product_ids = None
+        self.index = {}
+        self.type_codes = None
+        self.types = None
+        self.type_index = {}
+        self.members = {}
+        self.decayed = None
+        self.liked_sum = None
+        self.liked_count = None
+        self.liked_users = None
+        self.liked_pairs = np.empty(0, dtype=np.uint64)
+        self.last_id = 0
+        self.rows_seen = 0
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self._top = {}
+        self._dirty = set()
+        # Reentrant: trending() holds it across top(), so a rebuild cannot swap the arrays in between
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def set_catalog(self, product_ids, product_types):
+        product_ids = pd.Index(pd.Series(product_ids).astype(str))
+        codes, uniques = pd.factorize(pd.Series(product_types, dtype=object), use_na_sentinel=True)
+        self.product_ids = product_ids.to_numpy(dtype=object)
+        self.index = {product_id: i for i, product_id in enumerate(self.product_ids)}
+        self.type_codes = codes.astype(np.int32)
+        self.types = [str(t) for t in uniques]
+        self.type_index = {t: code for code, t in enumerate(self.types)}
+
+        order = np.argsort(self.type_codes, kind='stable')
+        sorted_codes = self.type_codes[order]
+        bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+        self.members = {
+            int(sorted_codes[group[0]]): order[group]
+            for group in np.split(np.arange(len(order)), bounds)
+            if len(group) and sorted_codes[group[0]] >= 0
+        }
+
+        n = len(self.product_ids)
+        self.decayed = np.zeros(n, dtype=np.float64)
+        self.liked_sum = np.zeros(n, dtype=np.float64)
+        self.liked_count = np.zeros(n, dtype=np.int64)
+        self.liked_users = np.zeros(n, dtype=np.int64)
+        self.liked_pairs = np.empty(0, dtype=np.uint64)
+        self._top = {}
+        self._dirty = set(self.members)
+        return self
+
+    @classmethod
+    def from_engine(cls, engine, chunk_size=100000, **kwargs):
+        """Builds the counters in one streaming pass over the liked ratings"""
+        start_time = time.time()
+        trending = cls(engine=engine, **kwargs)
+        with engine.connect() as conn:
+            catalog = conn.execute(CATALOG_QUERY).fetchall()
+            trending.set_catalog([row.ProductId for row in catalog], [row.ProductType for row in catalog])
+            last_id, rows_seen = conn.execute(TABLE_STATE_QUERY).fetchone()
+            total = trending._apply_events(conn, 0, last_id or 0, chunk_size)
+            trending.last_id, trending.rows_seen = last_id or 0, rows_seen
+
+        print(f"Trending engine built from {total} ratings over {len(trending.product_ids)} products "
+              f"(half-life {trending.half_life_days}d) in {time.time() - start_time:.1f}s")
+        return trending
+
+    def _apply_events(self, conn, after_id, until_id, chunk_size):
+        result = conn.execution_options(stream_results=True).execute(
+            TREND_EVENTS_QUERY, {"after_id": after_id, "until_id": until_id}
+        )
+        total = 0
+        while True:
+            rows = result.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunk = pd.DataFrame(rows, columns=['ProductId', 'UserId', 'Rating', 'Timestamp'])
+            self.add_ratings(
+                chunk['ProductId'].astype(str).to_numpy(),
+                chunk['UserId'].to_numpy(dtype=object),
+                chunk['Rating'].to_numpy(dtype=np.float64),
+                chunk['Timestamp'].to_numpy(dtype=np.float64)
+            )
+            total += len(rows)
+        return total
+
+    def refresh(self, chunk_size=100000):
+        """
+        Catches up with amazon_beauty.  Liked ratings with an id past the last
+        one read are applied in place.  If the rows up to that id no longer
+        match (the table was reloaded) or the catalog changed size, the
+        counters are rebuilt from scratch and swapped in.  Returns the number
+        of liked ratings the catch-up read, or None after a rebuild.
+        """
+        with self._refresh_lock:
+            with self.engine.connect() as conn:
+                max_id, rows = conn.execute(TABLE_STATE_QUERY).fetchone()
+                max_id = max_id or 0
+                unchanged = (
+                    max_id >= self.last_id
+                    and conn.execute(ROWS_UP_TO_QUERY, {"last_id": self.last_id}).scalar() == self.rows_seen
+                    and conn.execute(CATALOG_SIZE_QUERY).scalar() == len(self.product_ids)
+                )
+                if unchanged:
+                    total = self._apply_events(conn, self.last_id, max_id, chunk_size)
+                    self.last_id, self.rows_seen = max_id, rows
+                    return total
+
+            rebuilt = type(self).from_engine(
+                self.engine, chunk_size,
+                half_life_days=self.half_life_days, min_ratings=self.min_ratings, top_k=self.top_k
+            )
+            with self._lock:
+                for name in _STATE_ATTRIBUTES:
+                    setattr(self, name, getattr(rebuilt, name))
+                self._top = {}
+                self._dirty = set(self.members)
+            return None
+
+    def start_background_refresh(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop,
+            name="trending-engine-refresh",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing trending engine: {str(e)}")
+
+    def _rebase(self, landmark):
+        """Moves the landmark forward, rescaling the counters so they do not overflow"""
+        if self.landmark is not None:
+            self.decayed *= math.exp(-self.decay_rate * (landmark - self.landmark))
+        self.landmark = landmark
+
+    def add_ratings(self, product_ids, user_ids, ratings, timestamps):
+        """
+        Applies a batch of new ratings; ratings below 4 and products outside the
+        catalog are ignored.  Returns the ProductTypes whose ranking changed.
+        """
+        product_ids = np.asarray(product_ids, dtype=object)
+        user_ids = np.asarray(user_ids, dtype=object)
+        ratings = np.asarray(ratings, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+
+        with self._lock:
+            items = np.fromiter((self.index.get(p, -1) for p in product_ids), dtype=np.int64, count=len(product_ids))
+            keep = (items >= 0) & (ratings >= 4.0) & ~np.isnan(timestamps)
+            items, user_ids, ratings, timestamps = items[keep], user_ids[keep], ratings[keep], timestamps[keep]
+            if not len(items):
+                return set()
+
+            if self.landmark is None:
+                self._rebase(float(timestamps.min()))
+            newest = float(timestamps.max())
+            if self.decay_rate * (newest - self.landmark) > MAX_EXPONENT:
+                self._rebase(newest)
+            if self.latest_timestamp is None or newest > self.latest_timestamp:
+                self.latest_timestamp = newest
+
+            weights = ratings * np.exp(self.decay_rate * (timestamps - self.landmark))
+            np.add.at(self.decayed, items, weights)
+            np.add.at(self.liked_sum, items, ratings)
+            np.add.at(self.liked_count, items, 1)
+            self._add_liked_users(items, user_ids)
+
+            touched = set(np.unique(self.type_codes[items]).tolist()) - {-1}
+            self._dirty |= touched
+        return {self.types[code] for code in touched}
+
+    def _add_liked_users(self, items, user_ids):
+        """Counts the (product, user) pairs not seen before; the caller holds the lock"""
+        has_user = pd.notna(user_ids)
+        if not has_user.any():
+            return
+        items = items[has_user]
+        pairs = pd.util.hash_pandas_object(
+            pd.DataFrame({'item': items, 'user': user_ids[has_user].astype(str)}), index=False
+        ).to_numpy()
+        pairs, first = np.unique(pairs, return_index=True)
+        if len(self.liked_pairs):
+            positions = np.searchsorted(self.liked_pairs, pairs).clip(max=len(self.liked_pairs) - 1)
+            new = self.liked_pairs[positions] != pairs
+            pairs, first = pairs[new], first[new]
+        np.add.at(self.liked_users, items[first], 1)
+        self.liked_pairs = np.insert(self.liked_pairs, np.searchsorted(self.liked_pairs, pairs), pairs)
+
+    def _scale(self):
+        if self.landmark is None:
+            return 0.0
+        return math.exp(-self.decay_rate * (self.latest_timestamp - self.landmark))
+
+    def _ranked(self, type_code):
+        with self._lock:
+            if type_code in self._dirty or type_code not in self._top:
+                members = self.members.get(type_code, np.empty(0, dtype=np.int64))
+                eligible = members[self.liked_users[members] >= self.min_ratings]
+                if len(eligible) > self.top_k:
+                    eligible = eligible[np.argpartition(-self.decayed[eligible], self.top_k - 1)[:self.top_k]]
+                order = np.lexsort((-self.liked_users[eligible], -self.decayed[eligible]))
+                self._top[type_code] = eligible[order]
+                self._dirty.discard(type_code)
+            return self._top[type_code]
+
+    def top(self, product_type, num_products=10, exclude=None):
+        """Top products of a ProductType as (ProductId, score, avg liked rating, distinct liking users)"""
+        with self._lock:
+            type_code = self.type_index.get(product_type)
+            if type_code is None:
+                return []
+            ranked = self._ranked(type_code)
+            scale = self._scale()
+
+            results = []
+            for j in ranked:
+                product_id = self.product_ids[j]
+                if product_id == exclude:
+                    continue
+                results.append((
+                    product_id,
+                    float(self.decayed[j] * scale),
+                    float(self.liked_sum[j] / self.liked_count[j]),
+                    int(self.liked_users[j])
+                ))
+                if len(results) == num_products:
+                    break
+            return results
+
+    def trending(self, product_id, num_products=10):
+        """Trending products of the same ProductType, or None for unknown products"""
+        with self._lock:
+            i = self.index.get(product_id)
+            if i is None:
+                return None
+            type_code = self.type_codes[i]
+            if type_code < 0:
+                return []
+            return self.top(self.types[type_code], num_products, exclude=product_id)
+
+    @property
+    def memory_bytes(self):
+        return sum(
+            value.nbytes for value in (
+                self.decayed, self.liked_sum, self.liked_count, self.liked_users, self.liked_pairs, self.type_codes
+            )
+            if value is not None
+        )
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import ProductCard from '../product-card';
 import ProductSkeleton from '../product-skeleton';
 import CategoryFilter from '../category-filter';
@@ -12,7 +12,12 @@ const CategoryProducts = ({ categoryType }) => {
     const [selectedType, setSelectedType] = useState('all');
     const [productTypes, setProductTypes] = useState([]);
     const [page, setPage] = useState(1);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [totalProducts, setTotalProducts] = useState(0);
     const productsPerPage = 20;
+    // Backend-u kthen kategorinë me faqe; kërkojmë 100 produkte njëherësh
+    const fetchPageSize = 100;
+    const latestRequest = useRef(0);
     const [categories, setCategories] = useState([
         'makeup',
         'skincare',
@@ -49,7 +54,28 @@ const CategoryProducts = ({ categoryType }) => {
         }
     };
 
-    const fetchProducts = async () => {
+    // Tipet e produkteve të grupit të zgjedhur, për filtrin `type` të backend-it.
+    // Grupet përputhen vetëm me ProductType: një produkt që vetëm titulli i tij
+    // e fut në grup (p.sh. "lip" në titull, por tip tjetër) nuk shfaqet më aty.
+    const typesForGroup = (type) => {
+        if (type === 'All Products' || type === 'all') {
+            return [];
+        }
+        const group = groupProductTypes(productTypes).find(g => g.name === type);
+        return group ? group.types : [];
+    };
+
+    const productsUrl = (category, type, cursor) => {
+        const params = new URLSearchParams({ per_page: fetchPageSize });
+        typesForGroup(type).forEach(productType => params.append('type', productType));
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        return `http://localhost:5001/api/${category}?${params}`;
+    };
+
+    const fetchProducts = async (type = selectedType) => {
+        const request = ++latestRequest.current;
         try {
             const category = categoryType.toLowerCase();
             if (!categories.includes(category)) {
@@ -60,7 +86,7 @@ const CategoryProducts = ({ categoryType }) => {
             setLoading(true);
             setError(null);
 
-            const url = `http://localhost:5001/api/${category}`;
+            const url = productsUrl(category, type, null);
             console.log('Fetching products from:', url);
 
             const response = await fetch(url, {
@@ -74,14 +100,25 @@ const CategoryProducts = ({ categoryType }) => {
             console.log('Response status:', response.status);
             const data = await response.json();
             console.log('Response data:', data);
+            // Një përgjigje e vonuar për një tip tjetër nuk mbishkruan atë të fundit
+            if (request !== latestRequest.current) {
+                return;
+            }
 
             if (data && data.products && data.products.length > 0) {
                 const products = data.products;
-                saveToCache(category, products);
+                if (typesForGroup(type).length === 0) {
+                    saveToCache(category, products);
+                }
 
                 setAllProducts(products);
+                setNextCursor(data.next_cursor || null);
+                setTotalProducts(data.total || products.length);
                 setDisplayedProducts(products.slice(0, productsPerPage));
-                const types = [...new Set(products.map(p => p.ProductType))];
+                // Facet-et numërojnë të gjitha tipet e kategorisë, jo vetëm ato të faqes së parë
+                const types = data.facets && data.facets.types
+                    ? data.facets.types.map(facet => facet.ProductType)
+                    : [...new Set(products.map(p => p.ProductType))];
                 setProductTypes(types);
             } else {
                 throw new Error('No products found for this category');
@@ -91,129 +128,58 @@ const CategoryProducts = ({ categoryType }) => {
             console.error('Error details:', err);
             setError(err.message);
         } finally {
-            setLoading(false);
+            if (request === latestRequest.current) {
+                setLoading(false);
+            }
         }
     };
 
-    const getSubcategoryKeywords = (subcategory) => {
-        const subcategoryMap = {
-            // Makeup
-            'Eye Makeup': [
-                'eye', 'mascara', 'eyeliner', 'kajal', 'shadow',
-                'eyeshadow', 'eye liner', 'eye shadow', 'eye makeup'
-            ],
-            'Lip Products': [
-                'lip', 'lipstick', 'gloss', 'lip gloss', 'lip stick',
-                'lipgloss', 'lip color', 'lip colour', 'lip stain',
-                'lip liner', 'lipliner', 'lip balm', 'lipbalm'
-            ],
-            'Face Makeup': [
-                'foundation', 'concealer', 'powder', 'blush', 'compact',
-                'face powder', 'bb cream', 'cc cream', 'primer',
-                'bronzer', 'highlighter', 'contour', 'face makeup'
-            ],
-            'Nail Products': [
-                'nail', 'polish', 'lacquer', 'nail polish',
-                'nail color', 'nail colour', 'nail care', 'nail art'
-            ],
-
-            // Skincare
-            'Cleansers': [
-                'cleanser', 'face wash', 'facial wash', 'cleaning',
-                'cleansing', 'face cleanser', 'facial cleanser'
-            ],
-            'Moisturizers': [
-                'moisturizer', 'cream', 'lotion', 'hydrating',
-                'moisturizing', 'face cream', 'facial cream',
-                'day cream', 'night cream', 'hydration'
-            ],
-            'Treatments': [
-                'serum', 'treatment', 'essence', 'ampoule',
-                'face serum', 'facial serum', 'skin treatment'
-            ],
-            'Masks': [
-                'mask', 'pack', 'peel', 'face mask',
-                'facial mask', 'sheet mask', 'clay mask'
-            ],
-            'Toners': [
-                'toner', 'mist', 'essence', 'facial toner',
-                'face toner', 'skin toner'
-            ],
-
-            // Haircare
-            'Shampoos': [
-                'shampoo', 'hair wash', 'hair cleaner',
-                'hair cleanser', 'hair cleaning'
-            ],
-            'Conditioners': [
-                'conditioner', 'conditioning', 'hair conditioner',
-                'deep conditioner', 'leave-in conditioner'
-            ],
-            'Hair Treatments': [
-                'hair treatment', 'hair mask', 'hair oil', 'hair serum',
-                'hair care', 'scalp treatment', 'hair therapy'
-            ],
-
-            // Fragrance
-            'Perfumes': [
-                'perfume', 'parfum', 'eau de', 'fragrance',
-                'eau de parfum', 'eau de toilette', 'edt', 'edp'
-            ],
-            'Body Sprays': [
-                'body spray', 'body mist', 'body fragrance',
-                'deodorant spray', 'fragrance mist'
-            ],
-            'Deodorants': [
-                'deodorant', 'antiperspirant', 'anti-perspirant',
-                'deo', 'roll-on'
-            ]
-        };
-
-        return subcategoryMap[subcategory] || [];
+    // Filtri i tipit aplikohet nga backend-i, kështu që çdo faqe ka vetëm produkte të atij tipi
+    const selectType = (type) => {
+        setSelectedType(type);
+        setPage(1);
+        fetchProducts(type);
     };
 
-    const filterProductByType = (product, type) => {
-        if (type === 'All Products' || type === 'all') {
-            return true;
+    // Merr faqen tjetër nga backend-i me cursor-in e faqes së fundit
+    const fetchNextPage = async () => {
+        const request = latestRequest.current;
+        const category = categoryType.toLowerCase();
+        const response = await fetch(productsUrl(category, selectedType, nextCursor));
+        const data = await response.json();
+        if (request !== latestRequest.current) {
+            return null;
         }
+        const products = [...allProducts, ...(data.products || [])];
 
-        const productType = product.ProductType?.toLowerCase() || '';
-        const productTitle = product.ProductTitle?.toLowerCase() || '';
-        const keywords = getSubcategoryKeywords(type);
-
-        return keywords.some(keyword => {
-            const normalizedKeyword = keyword.toLowerCase().trim();
-            return productType.includes(normalizedKeyword) ||
-                productTitle.includes(normalizedKeyword) ||
-                normalizedKeyword.split(' ').every(word =>
-                    productType.includes(word.toLowerCase()) ||
-                    productTitle.includes(word.toLowerCase())
-                );
-        });
+        setAllProducts(products);
+        setNextCursor(data.next_cursor || null);
+        return products;
     };
 
-    // Përditësojmë filtrimin kur ndryshon tipi i zgjedhur
-    useEffect(() => {
-        if (allProducts.length > 0) {
-            const filtered = allProducts.filter(p => filterProductByType(p, selectedType));
-            setDisplayedProducts(filtered.slice(0, page * productsPerPage));
-        }
-    }, [selectedType, allProducts, page]);
-
-    // Përditësojmë loadMore për të përdorur produktet e filtruara
-    const loadMore = () => {
+    const loadMore = async () => {
         const nextPage = page + 1;
-        const filteredProducts = allProducts.filter(p => filterProductByType(p, selectedType));
-        const start = 0;
         const end = nextPage * productsPerPage;
+        let products = allProducts;
 
-        setDisplayedProducts(filteredProducts.slice(start, end));
-        setPage(nextPage);
+        try {
+            if (nextCursor && products.length < end) {
+                setLoading(true);
+                products = await fetchNextPage();
+            }
+        } catch (err) {
+            console.error('Error loading more products:', err);
+        } finally {
+            setLoading(false);
+        }
+
+        if (products) {
+            setDisplayedProducts(products.slice(0, end));
+            setPage(nextPage);
+        }
     };
 
-    // Përditësojmë hasMore për të përdorur produktet e filtruara
-    const hasMore = displayedProducts.length <
-        allProducts.filter(p => filterProductByType(p, selectedType)).length;
+    const hasMore = Boolean(nextCursor) || displayedProducts.length < allProducts.length;
 
     // Përditësojmë filteredProducts
     const filteredProducts = displayedProducts;
@@ -240,6 +206,7 @@ const CategoryProducts = ({ categoryType }) => {
         cleanOldCache();
     }, []);
 
+    // Grupon tipet nga facets.types sipas fjalëve kyçe në emrin e tipit (jo në titull)
     const groupProductTypes = (types) => {
         const grouped = new Map();
 
@@ -336,10 +303,12 @@ const CategoryProducts = ({ categoryType }) => {
     useEffect(() => {
         setPage(1);
         setAllProducts([]);
+        setNextCursor(null);
+        setTotalProducts(0);
         setDisplayedProducts([]);
         setProductTypes([]);
         setSelectedType('all');
-        fetchProducts();
+        fetchProducts('all');
     }, [categoryType]);
 
     if (loading && displayedProducts.length === 0) {
@@ -394,7 +363,7 @@ const CategoryProducts = ({ categoryType }) => {
                 <CategoryFilter
                     productTypes={productTypes}
                     selectedType={selectedType}
-                    onTypeSelect={setSelectedType}
+                    onTypeSelect={selectType}
                     categoryType={categoryType.toLowerCase()}
                     onGroupProducts={groupProductTypes}
                 />
@@ -416,7 +385,7 @@ const CategoryProducts = ({ categoryType }) => {
                         >
                             <span>Load More Products</span>
                             <span className="products-count">
-                                {allProducts.length - displayedProducts.length} more
+                                {Math.max(totalProducts, allProducts.length) - displayedProducts.length} more
                             </span>
                         </button>
 
@@ -425,12 +394,12 @@ const CategoryProducts = ({ categoryType }) => {
                                 <div
                                     className="progress"
                                     style={{
-                                        width: `${(displayedProducts.length / allProducts.length) * 100}%`
+                                        width: `${(displayedProducts.length / Math.max(totalProducts, allProducts.length)) * 100}%`
                                     }}
                                 />
                             </div>
                             <span>
-                                Showing {displayedProducts.length} of {allProducts.length} products
+                                Showing {displayedProducts.length} of {Math.max(totalProducts, allProducts.length)} products
                             </span>
                         </div>
                     </div>